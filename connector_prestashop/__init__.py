@@ -4,4 +4,5 @@
 from . import connector
 
 from . import components
+from . import controllers
 from . import models
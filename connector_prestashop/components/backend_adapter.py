@@ -8,7 +8,13 @@ from odoo.addons.connector.exception import NetworkRetryableError
 from contextlib import contextmanager
 from requests.exceptions import HTTPError, RequestException, ConnectionError
 import base64
+import io
 import logging
+import mimetypes
+import threading
+import uuid
+
+import requests
 
 _logger = logging.getLogger(__name__)
 
@@ -61,8 +67,146 @@ def api_handle_errors(message=''):
         )
 
 
+# HTTP sessions kept per worker thread, so the calls done by one job
+# (search, read, edit...) reuse the same keep-alive connections
+_session_pool = threading.local()
+
+
+# sizes of the compressed responses received by the current thread
+# during a batch, logged at its end
+_transfer_sizes = threading.local()
+
+
+def _log_compression(response, *args, **kwargs):
+    """ Response hook counting the bytes saved by the compression """
+    sizes = getattr(_transfer_sizes, 'sizes', None)
+    if sizes is None and not _logger.isEnabledFor(logging.DEBUG):
+        return
+    if not response.headers.get('Content-Encoding'):
+        return
+    decoded_size = len(response.content)
+    wire_size = response.headers.get('Content-Length')
+    if wire_size is None:
+        # chunked response, the raw stream knows what it has read
+        wire_size = response.raw.tell()
+    wire_size = int(wire_size)
+    if sizes is not None:
+        sizes[0] += wire_size
+        sizes[1] += decoded_size
+    _logger.debug(
+        '%s %s: %s bytes received, %s bytes decoded (%s bytes saved)',
+        response.request.method, response.url, wire_size, decoded_size,
+        decoded_size - wire_size)
+
+
+@contextmanager
+def log_transfer_sizes(description):
+    """ Log once the bytes saved by the compression of the responses
+    received in the block """
+    outer_sizes = getattr(_transfer_sizes, 'sizes', None)
+    sizes = _transfer_sizes.sizes = [0, 0]
+    try:
+        yield
+    finally:
+        _transfer_sizes.sizes = outer_sizes
+        if outer_sizes is not None:
+            outer_sizes[0] += sizes[0]
+            outer_sizes[1] += sizes[1]
+        elif sizes[1]:
+            _logger.info(
+                '%s: %s bytes received, %s bytes decoded (%s bytes saved)',
+                description, sizes[0], sizes[1], sizes[1] - sizes[0])
+
+
+def new_session(backend):
+    """ Build a HTTP session configured according to the backend
+
+    The responses are compressed with the encodings requests accepts by
+    default, unless the backend disables the compression.
+    """
+    session = requests.Session()
+    session.auth = (backend.webservice_key, '')
+    if not backend.http_compression:
+        session.headers['Accept-Encoding'] = 'identity'
+    session.hooks['response'].append(_log_compression)
+    return session
+
+
+def get_session(backend):
+    """ Return the HTTP session to use for the backend
+
+    When the backend reuses its sessions, the session is taken from a
+    pool local to the current thread, so the connection is kept alive
+    between the calls of a job instead of being opened for each call.
+    """
+    if not backend.http_session_reuse:
+        return new_session(backend)
+    key = (backend.env.cr.dbname, backend.id, backend.location,
+           backend.webservice_key, backend.http_compression)
+    pool = getattr(_session_pool, 'sessions', None)
+    if pool is None:
+        pool = _session_pool.sessions = {}
+    session = pool.get(key)
+    if session is None:
+        session = pool[key] = new_session(backend)
+    return session
+
+
+class MultipartFileBody(object):
+    """ ``multipart/form-data`` body sending a file object by chunks
+
+    The file is read while the request is sent, so the image is never
+    held in memory; the length is known up front, which lets requests
+    send a Content-Length header instead of a chunked body.
+    """
+
+    def __init__(self, field_name, filename, fileobj, size):
+        boundary = uuid.uuid4().hex
+        self.content_type = 'multipart/form-data; boundary=%s' % boundary
+        file_type = (mimetypes.guess_type(filename)[0] or
+                     'application/octet-stream')
+        head = ('--%s\r\n'
+                'Content-Disposition: form-data; name="%s"; filename="%s"\r\n'
+                'Content-Type: %s\r\n\r\n' % (
+                    boundary, field_name, filename, file_type)
+                ).encode('utf-8')
+        tail = ('\r\n--%s--\r\n' % boundary).encode('utf-8')
+        self._parts = [io.BytesIO(head), fileobj, io.BytesIO(tail)]
+        self._size = len(head) + size + len(tail)
+
+    def __len__(self):
+        return self._size
+
+    def read(self, size=-1):
+        chunks = []
+        while self._parts and size != 0:
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b''.join(chunks)
+
+
 class PrestaShopWebServiceImage(PrestaShopWebServiceDict):
 
+    def add_image(self, resource, resource_id, body, image_id=None):
+        """ Upload an image from a :class:`MultipartFileBody`
+
+        When ``image_id`` is given, the image is replaced in place.
+        """
+        full_url = self._api_url + 'images/%s/%s' % (resource, resource_id)
+        if image_id is not None:
+            # PrestaShop handles a POST flagged as PUT as a replacement,
+            # PUT requests cannot carry files with PHP
+            full_url += '/%s?ps_method=PUT' % (image_id,)
+        response = self._execute(full_url, 'POST', data=body,
+                                 add_headers={'Content-Type':
+                                              body.content_type})
+        return self._parse(response.content)
+
     def get_image(self, resource, resource_id=None, image_id=None,
                   options=None):
         full_url = self._api_url + 'images/' + resource
@@ -133,9 +277,14 @@ class PrestaShopCRUDAdapter(AbstractComponent):
             self.prestashop.api_url,
             self.prestashop.webservice_key,
             debug=self.backend_record.debug,
-            verbose=self.backend_record.verbose
+            verbose=self.backend_record.verbose,
+            session=self.get_session(),
         )
 
+    def get_session(self):
+        """ HTTP session shared by the clients of the backend """
+        return get_session(self.backend_record)
+
     def search(self, filters=None):
         """ Search records according to some criterias
         and returns a list of ids """
@@ -208,6 +357,25 @@ class GenericAdapter(AbstractComponent):
         first_key = list(res.keys())[0]
         return res[first_key]
 
+    def search_read(self, filters=None):
+        """ Search records according to some criterias and returns
+        their information, use the ``display`` filter to choose the
+        fields (``full`` for all of them)
+
+        :rtype: list
+        """
+        _logger.debug(
+            'method search_read, model %s, filters %s',
+            self._prestashop_model, str(filters))
+        res = self.client.get(self._prestashop_model, options=filters)
+        records = list(res.values())[0] if res else None
+        if not records:
+            return []
+        records = list(records.values())[0]
+        if isinstance(records, dict):
+            return [records]
+        return records
+
     def create(self, attributes=None):
         """ Create a record on the external system """
         _logger.debug(
@@ -1,8 +1,14 @@
 # © 2017 Sergio Teruel <sergio.teruel@tecnativa.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from odoo import models
 from odoo.addons.component.core import Component
 
+# PrestaShop IDs of the reference data, per database, backend and model:
+# {(dbname, backend_id, model): (version, {'internal': {...},
+#                                          'external': {...}})}
+_reference_cache = {}
+
 
 class PrestashopModelBinder(Component):
     """ Bind records and give odoo/prestashop ids correspondence
@@ -23,11 +29,6 @@ class PrestashopModelBinder(Component):
         'prestashop.res.partner',
         'prestashop.address',
         'prestashop.res.partner.category',
-        'prestashop.res.lang',
-        'prestashop.res.country',
-        'prestashop.res.currency',
-        'prestashop.account.tax',
-        'prestashop.account.tax.group',
         'prestashop.product.category',
         'prestashop.product.image',
         'prestashop.product.template',
@@ -35,7 +36,6 @@ class PrestashopModelBinder(Component):
         'prestashop.product.combination.option',
         'prestashop.product.combination.option.value',
         'prestashop.sale.order',
-        'prestashop.sale.order.state',
         'prestashop.delivery.carrier',
         'prestashop.refund',
         'prestashop.supplier',
@@ -43,3 +43,80 @@ class PrestashopModelBinder(Component):
         'prestashop.mail.message',
         'prestashop.groups.pricelist',
     ]
+
+
+class PrestashopReferenceBinder(Component):
+    """ Binder of the reference data, small sets of records used by the
+    mappings of most of the records
+
+    The correspondence of the IDs is read once per backend and kept in
+    memory until the reference data version of the backend changes.
+    """
+    _name = 'prestashop.reference.binder'
+    _inherit = 'prestashop.binder'
+
+    _apply_on = [
+        'prestashop.res.lang',
+        'prestashop.res.country',
+        'prestashop.res.currency',
+        'prestashop.account.tax',
+        'prestashop.account.tax.group',
+        'prestashop.sale.order.state',
+    ]
+
+    def _get_reference_map(self):
+        backend = self.backend_record
+        key = (self.env.cr.dbname, backend.id, self.model._name)
+        version = backend.reference_data_version
+        cached = _reference_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        reference_map = {'internal': {}, 'external': {}}
+        bindings = self.model.with_context(active_test=False).search_read(
+            [(self._backend_field, '=', backend.id)],
+            [self._external_field, self._odoo_field],
+            order='id',
+        )
+        for binding in bindings:
+            odoo_id = binding[self._odoo_field][0]
+            external_id = binding[self._external_field]
+            reference_map['internal'].setdefault(
+                str(external_id), (binding['id'], odoo_id))
+            reference_map['external'].setdefault(odoo_id, external_id)
+        _reference_cache[key] = (version, reference_map)
+        return reference_map
+
+    def to_internal(self, external_id, unwrap=False):
+        """ Give the Odoo recordset for an external ID
+
+        :param external_id: external ID for which we want
+                            the Odoo ID
+        :param unwrap: if True, returns the normal record
+                       else return the binding record
+        :return: a recordset, depending on the value of unwrap,
+                 or an empty recordset if the external_id is not mapped
+        :rtype: recordset
+        """
+        binding_id, odoo_id = self._get_reference_map()['internal'].get(
+            str(external_id), (None, None))
+        if unwrap:
+            odoo_model = self.model._fields[self._odoo_field].comodel_name
+            return self.env[odoo_model].browse(odoo_id or [])
+        return self.model.browse(binding_id or [])
+
+    def to_external(self, binding, wrap=False):
+        """ Give the external ID for an Odoo binding ID
+
+        :param binding: Odoo binding for which we want the external id
+        :param wrap: if True, binding is a normal record, the
+                     method will search the corresponding binding and return
+                     the external id of the binding
+        :return: external ID of the record
+        """
+        if not wrap:
+            return super(PrestashopReferenceBinder, self).to_external(
+                binding, wrap=wrap)
+        if isinstance(binding, models.BaseModel):
+            binding.ensure_one()
+            binding = binding.id
+        return self._get_reference_map()['external'].get(binding)
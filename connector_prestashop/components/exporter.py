@@ -50,15 +50,36 @@ class PrestashopBaseExporter(AbstractComponent):
         self.binding_id = binding.id
         self.binding = binding
         self.prestashop_id = self.binder.to_external(self.binding)
+        grouped = self.backend_record.grouped_export
+        recovered = False
+        if grouped and not self.prestashop_id:
+            # created on PrestaShop by a previous attempt which failed
+            self.prestashop_id = self._journal.recover_external_id(
+                self.backend_record, self.binding)
+            recovered = bool(self.prestashop_id)
+        created = not self.prestashop_id
         result = self._run(*args, **kwargs)
 
-        self.binder.bind(self.prestashop_id, self.binding)
-        # commit so we keep the external ID if several cascading exports
-        # are called and one of them fails
-        self.env.cr.commit()  # pylint: disable=invalid-commit
+        if grouped:
+            # the journal keeps the external ID until the job commits
+            if created and self.prestashop_id:
+                self._journal.record_external_id(
+                    self.backend_record, self.binding, self.prestashop_id)
+            elif recovered:
+                self._journal.forget(self.backend_record, self.binding)
+            self.binder.bind(self.prestashop_id, self.binding)
+        else:
+            self.binder.bind(self.prestashop_id, self.binding)
+            # commit so we keep the external ID if several cascading
+            # exports are called and one of them fails
+            self.env.cr.commit()  # pylint: disable=invalid-commit
         self._after_export()
         return result
 
+    @property
+    def _journal(self):
+        return self.env['prestashop.export.journal']
+
     def _run(self, *args, **kwargs):
         """ Flow of the synchronization, implemented in inherited classes"""
         raise NotImplementedError
@@ -82,7 +103,8 @@ class PrestashopBaseExporter(AbstractComponent):
         self.binder.bind(presta_id, self.binding)
         # commit so we keep the external ID if several cascading exports
         # are called and one of them fails
-        self.env.cr.commit()  # pylint: disable=invalid-commit
+        if not self.backend_record.grouped_export:
+            self.env.cr.commit()  # pylint: disable=invalid-commit
         self._after_export()
         return result
 
@@ -170,9 +192,11 @@ class PrestashopExporter(AbstractComponent):
                     binding = model_c.create(_bind_values)
                     # Eager commit to avoid having 2 jobs
                     # exporting at the same time.
-                    # do never commit during tests
-                    if not getattr(threading.currentThread(), 'testing',
-                                   False):
+                    # do never commit during tests, nor in the grouped
+                    # exports, which commit at the end of the job
+                    if not (getattr(threading.currentThread(), 'testing',
+                                    False) or
+                            self.backend_record.grouped_export):
                         model_c._cr.commit()  # pylint: disable=invalid-commit
         else:
             # If prestashop_bind_ids does not exist we are typically in a
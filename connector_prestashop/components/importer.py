@@ -3,6 +3,8 @@
 import logging
 from contextlib import closing, contextmanager
 
+import psycopg2
+
 import odoo
 from odoo import _
 
@@ -13,6 +15,8 @@ from odoo.addons.queue_job.exception import (
 
 from odoo.addons.component.core import AbstractComponent
 
+from .backend_adapter import log_transfer_sizes
+
 _logger = logging.getLogger(__name__)
 
 RETRY_ON_ADVISORY_LOCK = 1  # seconds
@@ -188,56 +192,60 @@ class PrestashopImporter(AbstractComponent):
                     # commit (in a new cursor). Disable the warning.
                     cr.commit()  # pylint: disable=invalid-commit
 
-    def _check_in_new_connector_env(self):
-        # with self.do_in_new_connector_env() as new_connector_env:
-        with self.do_in_new_connector_env():
-            # Even when we use an advisory lock, we may have
-            # concurrent issues.
-            # Explanation:
-            # We import Partner A and B, both of them import a
-            # partner category X.
-            #
-            # The squares represent the duration of the advisory
-            # lock, the transactions starts and ends on the
-            # beginnings and endings of the 'Import Partner'
-            # blocks.
-            # T1 and T2 are the transactions.
-            #
-            # ---Time--->
-            # > T1 /------------------------\
-            # > T1 | Import Partner A       |
-            # > T1 \------------------------/
-            # > T1        /-----------------\
-            # > T1        | Imp. Category X |
-            # > T1        \-----------------/
-            #                     > T2 /------------------------\
-            #                     > T2 | Import Partner B       |
-            #                     > T2 \------------------------/
-            #                     > T2        /-----------------\
-            #                     > T2        | Imp. Category X |
-            #                     > T2        \-----------------/
-            #
-            # As you can see, the locks for Category X do not
-            # overlap, and the transaction T2 starts before the
-            # commit of T1. So no lock prevents T2 to import the
-            # category X and T2 does not see that T1 already
-            # imported it.
-            #
-            # The workaround is to open a new DB transaction at the
-            # beginning of each import (e.g. at the beginning of
-            # "Imp. Category X") and to check if the record has been
-            # imported meanwhile. If it has been imported, we raise
-            # a Retryable error so T2 is rollbacked and retried
-            # later (and the new T3 will be aware of the category X
-            # from the its inception).
-            binder = self.binder_for(model=self.model._name)
-            # binder = new_connector_env.get_connector_unit(Binder)
-            if binder.to_internal(self.prestashop_id):
-                raise RetryableJobError(
-                    'Concurrent error. The job will be retried later',
-                    seconds=RETRY_WHEN_CONCURRENT_DETECTED,
-                    ignore_retry=True
-                )
+    def _check_concurrent_import(self):
+        """ Claim the creation of the binding, retry the job when another
+        transaction already created it """
+        # Even when we use an advisory lock, we may have
+        # concurrent issues.
+        # Explanation:
+        # We import Partner A and B, both of them import a
+        # partner category X.
+        #
+        # The squares represent the duration of the advisory
+        # lock, the transactions starts and ends on the
+        # beginnings and endings of the 'Import Partner'
+        # blocks.
+        # T1 and T2 are the transactions.
+        #
+        # ---Time--->
+        # > T1 /------------------------\
+        # > T1 | Import Partner A       |
+        # > T1 \------------------------/
+        # > T1        /-----------------\
+        # > T1        | Imp. Category X |
+        # > T1        \-----------------/
+        #                     > T2 /------------------------\
+        #                     > T2 | Import Partner B       |
+        #                     > T2 \------------------------/
+        #                     > T2        /-----------------\
+        #                     > T2        | Imp. Category X |
+        #                     > T2        \-----------------/
+        #
+        # As you can see, the locks for Category X do not
+        # overlap, and the transaction T2 starts before the
+        # commit of T1. So no lock prevents T2 to import the
+        # category X and T2 does not see that T1 already
+        # imported it.
+        #
+        # The workaround is to claim the record in a table where
+        # each import upserts a row: when T1 committed its claim
+        # after the snapshot of T2 was taken, the upsert of T2
+        # fails with a serialization error (we are in REPEATABLE
+        # READ). We raise a Retryable error so T2 is rollbacked
+        # and retried later (and the new T3 will be aware of the
+        # category X from the its inception). This costs one
+        # statement instead of a new connection and transaction.
+        try:
+            with self.env.cr.savepoint():
+                self.env['prestashop.import.claim'].claim(
+                    self.backend_record, self.model._name,
+                    self.prestashop_id)
+        except psycopg2.extensions.TransactionRollbackError:
+            raise RetryableJobError(
+                'Concurrent error. The job will be retried later',
+                seconds=RETRY_WHEN_CONCURRENT_DETECTED,
+                ignore_retry=True
+            )
 
     def run(self, prestashop_id, **kwargs):
         """ Run the synchronization
@@ -259,7 +267,7 @@ class PrestashopImporter(AbstractComponent):
 
         binding = self._get_binding()
         if not binding:
-            self._check_in_new_connector_env()
+            self._check_concurrent_import()
 
         skip = self._has_to_skip()
         if skip:
@@ -308,26 +316,71 @@ class BatchImporter(AbstractComponent):
     _usage = 'batch.importer'
 
     page_size = 1000
+    # Field of the PrestaShop records used for the incremental imports,
+    # None when the resource cannot be imported incrementally
+    _watermark_field = 'date_upd'
+
+    def __init__(self, work_context):
+        super(BatchImporter, self).__init__(work_context)
+        self.watermark = None
+        self.watermark_seen = None
+
+    def _get_watermark(self, filters):
+        """ Return the watermark driving this batch
+
+        Only the batches importing all the records of a resource use a
+        watermark, a batch scoped by other filters (the addresses of a
+        customer...) must not move it.
+        """
+        if not (self._watermark_field and
+                self.backend_record.incremental_import):
+            return None
+        filter_key = 'filter[%s]' % self._watermark_field
+        if set(filters) - {'date', filter_key}:
+            return None
+        return self.env['prestashop.sync.watermark'].get_watermark(
+            self.backend_record, self.model._name, self._watermark_field)
+
+    def _search_page(self, filters):
+        """ Return the ids of a page, keep the highest watermark """
+        if not self.watermark:
+            return self.backend_adapter.search(filters)
+        records = self.backend_adapter.search_read(filters)
+        self.watermark_seen = self.watermark.max_value(
+            records + [{self.watermark.field: self.watermark_seen}])
+        return [int(record['id']) for record in records]
 
     def run(self, filters=None, **kwargs):
         """ Run the synchronization """
+        with log_transfer_sizes('Batch import of %s' % self.model._name):
+            self._run_batch(filters=filters, **kwargs)
+
+    def _run_batch(self, filters=None, **kwargs):
         if filters is None:
             filters = {}
+        self.watermark = self._get_watermark(filters)
+        if self.watermark:
+            self.watermark.apply_filters(filters)
+            filters['display'] = '[id,%s]' % self._watermark_field
         if 'limit' in filters:
             self._run_page(filters, **kwargs)
-            return
-        page_number = 0
-        filters['limit'] = '%d,%d' % (
-            page_number * self.page_size, self.page_size)
-        record_ids = self._run_page(filters, **kwargs)
-        while len(record_ids) == self.page_size:
-            page_number += 1
+        else:
+            page_number = 0
             filters['limit'] = '%d,%d' % (
                 page_number * self.page_size, self.page_size)
             record_ids = self._run_page(filters, **kwargs)
+            while len(record_ids) == self.page_size:
+                page_number += 1
+                filters['limit'] = '%d,%d' % (
+                    page_number * self.page_size, self.page_size)
+                record_ids = self._run_page(filters, **kwargs)
+        if self.watermark:
+            # the imports of the records seen are now queued in this
+            # transaction, the next batches can start from there
+            self.watermark.advance(self.watermark_seen)
 
     def _run_page(self, filters, **kwargs):
-        record_ids = self.backend_adapter.search(filters)
+        record_ids = self._search_page(filters)
 
         for record_id in record_ids:
             self._import_record(record_id, **kwargs)
@@ -347,6 +400,7 @@ class DirectBatchImporter(AbstractComponent):
     _name = 'prestashop.direct.batch.importer'
     _inherit = 'prestashop.batch.importer'
     _model_name = None
+    _watermark_field = None
 
     def _import_record(self, external_id):
         """ Import the record directly """
@@ -361,28 +415,56 @@ class DelayedBatchImporter(AbstractComponent):
     _name = 'prestashop.delayed.batch.importer'
     _inherit = 'prestashop.batch.importer'
     _model_name = None
+    # Small records can be imported by chunks of the size configured on
+    # the backend instead of one job per record
+    _micro_batch = False
+
+    def _pop_job_options(self, kwargs):
+        return {
+            'priority': kwargs.pop('priority', None),
+            'eta': kwargs.pop('eta', None),
+            'max_retries': kwargs.pop('max_retries', None),
+            'description': kwargs.pop('description', None),
+            'channel': kwargs.pop('channel', None),
+            'identity_key': kwargs.pop('identity_key', None),
+        }
+
+    def _chunk_size(self):
+        if not self._micro_batch:
+            return 1
+        return max(self.backend_record.import_chunk_size, 1)
+
+    def _run_page(self, filters, **kwargs):
+        chunk_size = self._chunk_size()
+        if chunk_size == 1:
+            return super(DelayedBatchImporter, self)._run_page(
+                filters, **kwargs)
+        record_ids = self._search_page(filters)
+        for index in range(0, len(record_ids), chunk_size):
+            self._import_chunk(record_ids[index:index + chunk_size],
+                               **kwargs)
+        return record_ids
 
     def _import_record(self, external_id, **kwargs):
         """ Delay the import of the records"""
-        priority = kwargs.pop('priority', None)
-        eta = kwargs.pop('eta', None)
-        max_retries = kwargs.pop('max_retries', None)
-        description = kwargs.pop('description', None)
-        channel = kwargs.pop('channel', None)
-        identity_key = kwargs.pop('identity_key', None)
-
+        job_options = self._pop_job_options(kwargs)
         self.env[self.model._name].with_delay(
-            priority=priority,
-            eta=eta,
-            max_retries=max_retries,
-            description=description,
-            channel=channel,
-            identity_key=identity_key
+            **job_options
         ).import_record(
             backend=self.backend_record,
             prestashop_id=external_id,
             **kwargs)
 
+    def _import_chunk(self, external_ids, **kwargs):
+        """ Delay the import of a chunk of records in one job """
+        job_options = self._pop_job_options(kwargs)
+        self.env[self.model._name].with_delay(
+            **job_options
+        ).import_record_chunk(
+            backend=self.backend_record,
+            prestashop_ids=external_ids,
+            **kwargs)
+
 
 class TranslatableRecordImporter(AbstractComponent):
     """ Import one translatable record """
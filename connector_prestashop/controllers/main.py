@@ -0,0 +1,45 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import json
+import logging
+
+from odoo import exceptions, http, SUPERUSER_ID
+from odoo.http import request
+
+_logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-Prestashop-Signature'
+
+
+class PrestashopWebhookController(http.Controller):
+
+    @http.route('/connector_prestashop/webhook/<int:backend_id>',
+                type='http', auth='none', methods=['POST'], csrf=False)
+    def webhook(self, backend_id, **kwargs):
+        """ Receive the change notifications posted by PrestaShop
+
+        The body is signed with the webhook secret of the backend, the
+        signature is sent in the ``X-Prestashop-Signature`` header.
+        """
+        env = request.env(user=SUPERUSER_ID)
+        backend = env['prestashop.backend'].browse(backend_id).exists()
+        if not backend:
+            return self._response({'error': 'unknown backend'}, 404)
+        payload = request.httprequest.get_data()
+        signature = request.httprequest.headers.get(SIGNATURE_HEADER)
+        try:
+            queued = backend._webhook_receive(payload, signature)
+        except exceptions.AccessDenied:
+            _logger.warning('Webhook notification with an invalid '
+                            'signature refused for backend %s', backend_id)
+            return self._response({'error': 'invalid signature'}, 403)
+        except exceptions.UserError as err:
+            return self._response({'error': err.name}, 400)
+        return self._response({'queued': queued}, 200)
+
+    def _response(self, values, status):
+        return request.make_response(
+            json.dumps(values),
+            headers=[('Content-Type', 'application/json')],
+            status=status,
+        )
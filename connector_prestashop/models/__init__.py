@@ -7,6 +7,9 @@ from . import account_payment_mode
 from . import account_tax
 from . import account_tax_group
 from . import delivery_carrier
+from . import export_journal
+from . import import_claim
+from . import job_payload
 from . import mail_message
 from . import payment
 from . import stock_warehouse
@@ -27,3 +30,4 @@ from . import sale_order
 from . import sale_order_state
 from . import stock_move
 from . import stock_tracking
+from . import sync_watermark
@@ -48,6 +48,10 @@ class RefundMapper(Component):
         ('date_add', 'date_invoice'),
     ]
 
+    def __init__(self, work_context):
+        super(RefundMapper, self).__init__(work_context)
+        self._order_cache = {}
+
     @mapping
     def journal(self, record):
         journal = self.backend_record.refund_journal_id
@@ -59,8 +63,12 @@ class RefundMapper(Component):
         return {'journal_id': journal.id}
 
     def _get_order(self, record):
-        binder = self.binder_for('prestashop.sale.order')
-        return binder.to_internal(record['id_order'])
+        """ Return the order binding, resolved once per refund """
+        if record['id_order'] not in self._order_cache:
+            binder = self.binder_for('prestashop.sale.order')
+            self._order_cache[record['id_order']] = binder.to_internal(
+                record['id_order'])
+        return self._order_cache[record['id_order']]
 
     @mapping
     def from_sale_order(self, record):
@@ -92,8 +100,11 @@ class RefundMapper(Component):
         shipping_line = self._invoice_line_shipping(record, fpos)
         if shipping_line:
             lines.append((0, 0, shipping_line))
+        order_lines = self._get_order_lines(
+            [slip_detail['id_order_detail'] for slip_detail in slip_details])
         for slip_detail in slip_details:
-            line = self._invoice_line(slip_detail, fpos)
+            line = self._invoice_line(slip_detail, fpos,
+                                      order_lines=order_lines)
             lines.append((0, 0, line))
         return {'invoice_line_ids': lines}
 
@@ -113,14 +124,9 @@ class RefundMapper(Component):
         account_id = product.property_account_income_id.id
         if not account_id:
             account_id = product.categ_id.property_account_income_categ_id.id
-        if fpos:
-            fpos_obj = self.env['account.fiscal.position']
-            account_id = fpos_obj.map_account(
-                self.session.cr,
-                self.session.uid,
-                fpos,
-                account_id
-            )
+        if fpos and account_id:
+            account_id = fpos.map_account(
+                self.env['account.account'].browse(account_id)).id
         return {
             'quantity': 1,
             'product_id': product.id,
@@ -132,20 +138,23 @@ class RefundMapper(Component):
         }
 
     def _get_shipping_order_line(self, record):
-        binder = self.binder_for('prestashop.sale.order')
-        sale_order = binder.to_internal(record['id_order'], unwrap=True)
+        sale_order = self._get_order(record).odoo_id
         if not sale_order.carrier_id:
             return None
-        sale_order_line_ids = self.env['sale.order.line'].search([
+        sale_order_line = self.env['sale.order.line'].search([
             ('order_id', '=', sale_order.id),
             ('product_id', '=', sale_order.carrier_id.product_id.id),
-        ])
-        if not sale_order_line_ids:
+        ], limit=1)
+        if not sale_order_line:
             return None
-        return sale_order_line_ids[0].read([])
+        return sale_order_line.read(
+            ['name', 'product_id', 'price_unit', 'discount', 'tax_id'])[0]
 
-    def _invoice_line(self, record, fpos):
-        order_line = self._get_order_line(record['id_order_detail'])
+    def _invoice_line(self, record, fpos, order_lines=None):
+        if order_lines is None:
+            order_line = self._get_order_line(record['id_order_detail'])
+        else:
+            order_line = order_lines.get(int(record['id_order_detail']))
         tax_ids = []
         if order_line is None:
             product_id = None
@@ -162,13 +171,8 @@ class RefundMapper(Component):
                 categ = product.categ_id
                 account_id = categ.property_account_income_categ_id.id
         if fpos and account_id:
-            fpos_obj = self.session.pool['account.fiscal.position']
-            account_id = fpos_obj.map_account(
-                self.session.cr,
-                self.session.uid,
-                fpos,
-                account_id
-            )
+            account_id = fpos.map_account(
+                self.env['account.account'].browse(account_id)).id
         if record['product_quantity'] == '0':
             quantity = 1
         else:
@@ -208,6 +212,19 @@ class RefundMapper(Component):
         return order_line.with_context(
             company_id=self.backend_record.company_id.id)
 
+    def _get_order_lines(self, order_details_ids):
+        """ Return the order lines of the order details, by PrestaShop id
+
+        The lines are searched with one query for all the details of
+        the refund.
+        """
+        order_lines = self.env['prestashop.sale.order.line'].search([
+            ('prestashop_id', 'in', [int(details_id) for details_id
+                                     in order_details_ids]),
+            ('backend_id', '=', self.backend_record.id),
+        ]).with_context(company_id=self.backend_record.company_id.id)
+        return {line.prestashop_id: line for line in order_lines}
+
     @mapping
     def type(self, record):
         return {'type': 'out_refund'}
@@ -9,7 +9,7 @@ class PrestashopAccountTax(models.Model):
     # Do not inherit from `prestashop.binding.odoo`
     # because we do not want the constraint `prestashop_erp_uniq`.
     # This allows us to create duplicated taxes.
-    _inherit = 'prestashop.binding'
+    _inherit = ['prestashop.binding', 'prestashop.reference.binding']
     _inherits = {'account.tax': 'odoo_id'}
 
     odoo_id = fields.Many2one(
@@ -27,7 +27,7 @@ class AccountTaxGroup(models.Model):
 
 class PrestashopAccountTaxGroup(models.Model):
     _name = 'prestashop.account.tax.group'
-    _inherit = 'prestashop.binding.odoo'
+    _inherit = ['prestashop.binding.odoo', 'prestashop.reference.binding']
     _inherits = {'account.tax.group': 'odoo_id'}
 
     odoo_id = fields.Many2one(
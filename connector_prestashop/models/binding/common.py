@@ -1,9 +1,13 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html)
 
+import logging
+
 from odoo import models, fields, api
 from odoo.addons.queue_job.job import job, related_action
 from odoo.addons.connector.exception import RetryableJobError
 
+_logger = logging.getLogger(__name__)
+
 
 class PrestashopBinding(models.AbstractModel):
     _name = 'prestashop.binding'
@@ -24,6 +28,10 @@ class PrestashopBinding(models.AbstractModel):
     prestashop_id = fields.Integer('ID on PrestaShop')
     no_export = fields.Boolean('No export to PrestaShop')
 
+    # lowest priority of the exports of some fields, which have to run
+    # after the other exports, kept when they are merged in one job
+    _export_field_priorities = {}
+
     _sql_constraints = [
         ('prestashop_uniq', 'unique(backend_id, prestashop_id)',
          'A record with same ID on PrestaShop already exists.'),
@@ -45,6 +53,35 @@ class PrestashopBinding(models.AbstractModel):
             importer = work.component(usage='record.importer')
             return importer.run(prestashop_id, force=force)
 
+    @job(default_channel='root.prestashop')
+    @api.model
+    def import_record_chunk(self, backend, prestashop_ids, **kwargs):
+        """ Import a chunk of records from PrestaShop
+
+        Each record is imported in its own savepoint, the records which
+        fail are delayed again in a job of their own, where they are
+        retried and reported like any single import.
+        """
+        self.check_active(backend)
+        failed_ids = []
+        with backend.work_on(self._name) as work:
+            for prestashop_id in prestashop_ids:
+                importer = work.component(usage='record.importer')
+                try:
+                    with self.env.cr.savepoint():
+                        importer.run(prestashop_id, **kwargs)
+                except Exception as err:
+                    _logger.info('Import of %s %s failed in a chunk, '
+                                 'delayed alone: %s',
+                                 self._name, prestashop_id, err)
+                    # the cache may contain values rolled back
+                    self.env.clear()
+                    failed_ids.append(prestashop_id)
+        for prestashop_id in failed_ids:
+            self.with_delay().import_record(backend, prestashop_id, **kwargs)
+        return '%d records imported, %d delayed alone' % (
+            len(prestashop_ids) - len(failed_ids), len(failed_ids))
+
     @job(default_channel='root.prestashop')
     @api.model
     def import_batch(self, backend, filters=None, **kwargs):
@@ -67,6 +104,60 @@ class PrestashopBinding(models.AbstractModel):
             exporter = work.component(usage='record.exporter')
             return exporter.run(self, fields)
 
+    @api.multi
+    def delay_export_record(self, fields=None, priority=None):
+        """ Delay the export of the records, merged with the export
+        already pending for each of them
+
+        The job is delayed by the export settle delay of the backend and
+        identified by the binding: the writes done meanwhile add their
+        fields to the pending job instead of delaying new exports. The
+        merged job keeps the priority of its most urgent export, but not
+        above the one of the fields of ``_export_field_priorities``. A
+        job already enqueued is not amended, a new job is delayed.
+        """
+        job_model = self.env['queue.job'].sudo()
+        for binding in self:
+            base_key = 'export_record(%s,%s)' % (binding._name, binding.id)
+            # an enqueued job is not amended anymore but still matches
+            # its identity key, the next export uses the other key
+            identity_keys = [base_key, '%s+' % base_key]
+            jobs = job_model.search([
+                ('identity_key', 'in', identity_keys),
+                ('state', 'in', ('pending', 'enqueued')),
+            ])
+            pending_job = jobs.filtered(lambda j: j.state == 'pending')[:1]
+            if not pending_job:
+                enqueued_keys = set(jobs.mapped('identity_key'))
+                free_keys = [key for key in identity_keys
+                             if key not in enqueued_keys]
+                binding.with_delay(
+                    priority=priority,
+                    eta=binding.backend_id.export_settle_delay or None,
+                    identity_key=free_keys[0] if free_keys else None,
+                ).export_record(fields=fields)
+                continue
+            kwargs = dict(pending_job.kwargs)
+            merged_fields = set(kwargs.get('fields') or []) | set(fields or [])
+            if kwargs.get('fields') is not None:
+                # no fields means a full export
+                kwargs['fields'] = (
+                    None if fields is None
+                    else sorted(merged_fields)
+                )
+                pending_job.kwargs = kwargs
+            new_priority = pending_job.priority
+            if priority is not None:
+                new_priority = min(new_priority, priority)
+            new_priority = max([new_priority] + [
+                binding._export_field_priorities[field]
+                for field in merged_fields
+                if field in binding._export_field_priorities
+            ])
+            if new_priority != pending_job.priority:
+                pending_job.priority = new_priority
+        return True
+
     @job(default_channel='root.prestashop')
     @related_action(action='related_action_record')
     @api.multi
@@ -121,3 +212,33 @@ class PrestashopBindingOdoo(models.AbstractModel):
         ('prestashop_erp_uniq', 'unique(backend_id, odoo_id)',
          'An ERP record with same ID already exists on PrestaShop.'),
     ]
+
+
+class PrestashopReferenceBinding(models.AbstractModel):
+    """ Bindings of the reference data: languages, countries, taxes...
+
+    Their PrestaShop IDs are cached by the reference binder. Any change
+    bumps the reference data version of the backend, which invalidates
+    the cache of all the workers.
+    """
+    _name = 'prestashop.reference.binding'
+
+    @api.model
+    def create(self, vals):
+        record = super(PrestashopReferenceBinding, self).create(vals)
+        record.backend_id.bump_reference_data_version()
+        return record
+
+    @api.multi
+    def write(self, vals):
+        backends = self.mapped('backend_id')
+        res = super(PrestashopReferenceBinding, self).write(vals)
+        (backends | self.mapped('backend_id')).bump_reference_data_version()
+        return res
+
+    @api.multi
+    def unlink(self):
+        backends = self.mapped('backend_id')
+        res = super(PrestashopReferenceBinding, self).unlink()
+        backends.bump_reference_data_version()
+        return res
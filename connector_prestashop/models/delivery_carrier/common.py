@@ -80,3 +80,9 @@ class DeliveryCarrierAdapter(Component):
             filters = {}
         filters['filter[deleted]'] = 0
         return super(DeliveryCarrierAdapter, self).search(filters)
+
+    def search_read(self, filters=None):
+        if filters is None:
+            filters = {}
+        filters['filter[deleted]'] = 0
+        return super(DeliveryCarrierAdapter, self).search_read(filters)
@@ -79,11 +79,21 @@ class DeliveryCarrierBatchImporter(Component):
     _apply_on = 'prestashop.delivery.carrier'
 
     _model_name = ['prestashop.delivery.carrier']
+    # PrestaShop copies a carrier under a new ID when it is modified
+    _watermark_field = 'id'
 
     def run(self, filters=None, **kwargs):
         """ Run the synchronization """
-        record_ids = self.backend_adapter.search(filters=filters)
+        if filters is None:
+            filters = {}
+        self.watermark = self._get_watermark(filters)
+        if self.watermark:
+            self.watermark.apply_filters(filters)
+            filters['display'] = '[id]'
+        record_ids = self._search_page(filters)
         _logger.info('search for prestashop carriers %s returned %s',
                      filters, record_ids)
         for record_id in record_ids:
             self._import_record(record_id, **kwargs)
+        if self.watermark:
+            self.watermark.advance(self.watermark_seen)
@@ -0,0 +1,155 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import threading
+import weakref
+
+import odoo
+from odoo import models, fields, api
+
+# side cursor of the journal and keys to remove on commit, by cursor of
+# the exports
+_journal_cursors = weakref.WeakKeyDictionary()
+
+
+def _is_testing():
+    return getattr(threading.currentThread(), 'testing', False)
+
+
+class PrestashopExportJournal(models.Model):
+    """ External IDs of the records created on PrestaShop by the grouped
+    exports which are not committed yet
+
+    The grouped exports commit only at the end of the job. The rows are
+    written in their own transaction as soon as PrestaShop returns the
+    ID, so an export failing afterwards finds back the records it
+    already created instead of creating them twice. The rows of a
+    transaction are written on one cursor of their own and removed once
+    the transaction, which binds the records, is committed.
+    """
+    _name = 'prestashop.export.journal'
+    _description = 'PrestaShop Export Journal'
+    _order = 'create_date desc'
+
+    backend_id = fields.Many2one(
+        comodel_name='prestashop.backend',
+        string='PrestaShop Backend',
+        required=True,
+        ondelete='cascade',
+    )
+    model = fields.Char(string='Binding Model', required=True)
+    res_id = fields.Integer(
+        string='Odoo Record ID',
+        required=True,
+        help="ID of the Odoo record, the binding itself may have been "
+             "rolled back with the export.",
+    )
+    external_id = fields.Char(string='PrestaShop ID', required=True)
+
+    _sql_constraints = [
+        ('record_uniq', 'unique(backend_id, model, res_id)',
+         'This record is already in the journal.'),
+    ]
+
+    @api.model
+    def _get_res_id(self, binding):
+        if 'odoo_id' in binding._fields:
+            return binding.odoo_id.id
+        return binding.id
+
+    @api.model
+    def _domain(self, backend, binding):
+        return [('backend_id', '=', backend.id),
+                ('model', '=', binding._name),
+                ('res_id', '=', self._get_res_id(binding))]
+
+    def _side_cursor(self):
+        """ Cursor of the journal for the current transaction
+
+        One cursor is opened by transaction of the exports, its rows are
+        committed independently. Once the transaction commits, the rows
+        of the records it bound are removed and the cursor is closed; if
+        it is rolled back, they are kept for the next attempt.
+        """
+        cr = self.env.cr
+        state = _journal_cursors.get(cr)
+        if state is None:
+            side_cr = odoo.registry(cr.dbname).cursor()
+            state = _journal_cursors[cr] = {'cr': side_cr, 'keys': set()}
+
+            def on_commit():
+                keys = _journal_cursors.pop(cr)['keys']
+                try:
+                    if keys:
+                        self._delete_keys(side_cr, keys)
+                        side_cr.commit()
+                finally:
+                    side_cr.close()
+
+            def on_rollback():
+                _journal_cursors.pop(cr, None)
+                side_cr.close()
+
+            cr.after('commit', on_commit)
+            cr.after('rollback', on_rollback)
+        return state
+
+    @api.model
+    def _key(self, backend, binding):
+        return (backend.id, binding._name, self._get_res_id(binding))
+
+    @staticmethod
+    def _delete_keys(cr, keys):
+        cr.execute(
+            "DELETE FROM prestashop_export_journal "
+            "WHERE (backend_id, model, res_id) IN %s",
+            (tuple(keys),)
+        )
+
+    @api.model
+    def record_external_id(self, backend, binding, external_id):
+        """ Keep the ID of a record just created on PrestaShop until the
+        current transaction, which binds it, is committed """
+        key = self._key(backend, binding)
+        if _is_testing():
+            # nothing is committed in tests, the current cursor is used
+            cr = self.env.cr
+        else:
+            state = self._side_cursor()
+            state['keys'].add(key)
+            cr = state['cr']
+        cr.execute(
+            "INSERT INTO prestashop_export_journal "
+            "(backend_id, model, res_id, external_id, "
+            " create_uid, create_date, write_uid, write_date) "
+            "VALUES (%s, %s, %s, %s, %s, now() at time zone 'UTC', "
+            "        %s, now() at time zone 'UTC') "
+            "ON CONFLICT (backend_id, model, res_id) DO UPDATE "
+            "SET external_id = EXCLUDED.external_id, "
+            "    write_uid = EXCLUDED.write_uid, "
+            "    write_date = EXCLUDED.write_date",
+            key + (str(external_id), self.env.uid, self.env.uid)
+        )
+        if cr is not self.env.cr:
+            cr.commit()
+        else:
+            self.invalidate_cache()
+
+    @api.model
+    def recover_external_id(self, backend, binding):
+        """ Return the ID of the record if an export already created it """
+        journal = self.search(self._domain(backend, binding), limit=1)
+        return journal.external_id or None
+
+    @api.model
+    def forget(self, backend, binding):
+        """ Remove the ID of the record once the current transaction,
+        which binds it, is committed
+
+        The row is kept if the transaction is rolled back.
+        """
+        key = self._key(backend, binding)
+        if _is_testing():
+            self._delete_keys(self.env.cr, [key])
+            self.invalidate_cache()
+            return
+        self._side_cursor()['keys'].add(key)
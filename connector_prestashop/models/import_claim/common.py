@@ -0,0 +1,51 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import models, fields, api
+
+
+class PrestashopImportClaim(models.TransientModel):
+    """ Claim taken by a transaction creating a binding on import
+
+    A claim only needs to live as long as the transactions which may
+    import the same record, the old claims are vacuumed with the other
+    transient records.
+    """
+    _name = 'prestashop.import.claim'
+    _description = 'PrestaShop Import Claim'
+
+    backend_id = fields.Many2one(
+        comodel_name='prestashop.backend',
+        required=True,
+        ondelete='cascade',
+    )
+    model = fields.Char(required=True)
+    prestashop_id = fields.Char(required=True)
+
+    _sql_constraints = [
+        ('claim_uniq', 'unique(backend_id, model, prestashop_id)',
+         'This record is already claimed.'),
+    ]
+
+    @api.model
+    def claim(self, backend, model_name, prestashop_id):
+        """ Claim the import of a record for the current transaction
+
+        The claim row is inserted or refreshed. When another transaction
+        committed a claim for the same record after the snapshot of the
+        current transaction was taken, PostgreSQL cannot update the row
+        in the REPEATABLE READ isolation level and raises a serialization
+        failure.
+        """
+        self.env.cr.execute(
+            "INSERT INTO prestashop_import_claim "
+            "(backend_id, model, prestashop_id, "
+            " create_uid, create_date, write_uid, write_date) "
+            "VALUES (%s, %s, %s, "
+            "        %s, now() at time zone 'UTC', "
+            "        %s, now() at time zone 'UTC') "
+            "ON CONFLICT (backend_id, model, prestashop_id) "
+            "DO UPDATE SET write_uid = EXCLUDED.write_uid, "
+            "              write_date = EXCLUDED.write_date",
+            (backend.id, model_name, str(prestashop_id),
+             self.env.uid, self.env.uid)
+        )
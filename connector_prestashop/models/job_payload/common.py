@@ -0,0 +1,97 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+import psycopg2
+from psycopg2 import errorcodes
+
+from odoo import models, fields, api
+from odoo.addons.queue_job.exception import FailedJobError
+
+# arguments smaller than this are kept in the job
+PAYLOAD_MIN_SIZE = 1024
+PAYLOAD_TTL_DAYS = 30
+PAYLOAD_KEY = '__payload__'
+
+
+class PrestashopJobPayload(models.Model):
+    """ Large arguments of the jobs, stored once by content hash
+
+    The jobs receive ``{'__payload__': key}`` instead of the argument,
+    which keeps ``queue_job.args`` small for the job runner. The
+    payloads are removed ``PAYLOAD_TTL_DAYS`` after the last job using
+    them was enqueued.
+    """
+    _name = 'prestashop.job.payload'
+    _description = 'PrestaShop Job Payload'
+
+    key = fields.Char(required=True, index=True, readonly=True)
+    data = fields.Text(required=True, readonly=True)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(key)', 'A payload with this key already exists.'),
+    ]
+
+    @api.model
+    def pack(self, value):
+        """ Return the reference to pass to a job instead of the value
+
+        Small values are returned as is.
+        """
+        data = json.dumps(value, sort_keys=True)
+        if len(data) < PAYLOAD_MIN_SIZE:
+            return value
+        key = hashlib.sha1(data.encode('utf-8')).hexdigest()
+        # the same payload may be stored by concurrent jobs; written in
+        # SQL, the users enqueuing the jobs cannot access the payloads
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute(
+                    "INSERT INTO prestashop_job_payload "
+                    "(key, data, create_uid, create_date, "
+                    " write_uid, write_date) "
+                    "VALUES (%s, %s, %s, now() at time zone 'UTC', "
+                    "        %s, now() at time zone 'UTC') "
+                    "ON CONFLICT (key) DO NOTHING",
+                    (key, data, self.env.uid, self.env.uid),
+                    log_exceptions=False,
+                )
+                if not self.env.cr.rowcount:
+                    # already stored, keep it for the new job too
+                    self.env.cr.execute(
+                        "UPDATE prestashop_job_payload "
+                        "SET write_uid = %s, "
+                        "    write_date = now() at time zone 'UTC' "
+                        "WHERE key = %s",
+                        (self.env.uid, key),
+                        log_exceptions=False,
+                    )
+        except psycopg2.OperationalError as err:
+            if err.pgcode != errorcodes.SERIALIZATION_FAILURE:
+                raise
+            # under REPEATABLE READ, the row was inserted or updated by
+            # a transaction committed since ours started: it is recent
+        return {PAYLOAD_KEY: key}
+
+    @api.model
+    def unpack(self, value):
+        """ Return the value referenced by the argument of a job """
+        if not (isinstance(value, dict) and list(value) == [PAYLOAD_KEY]):
+            return value
+        # the jobs run as the user who enqueued them
+        payload = self.sudo().search(
+            [('key', '=', value[PAYLOAD_KEY])], limit=1)
+        if not payload:
+            raise FailedJobError(
+                'The payload %s of the job has been removed, the job '
+                'cannot be run anymore.' % value[PAYLOAD_KEY])
+        return json.loads(payload.data)
+
+    @api.model
+    def _scheduler_vacuum_payloads(self):
+        limit = datetime.now() - timedelta(days=PAYLOAD_TTL_DAYS)
+        self.sudo().search([
+            ('write_date', '<', fields.Datetime.to_string(limit)),
+        ]).unlink()
@@ -72,3 +72,6 @@ class MailMessageBatchImporter(Component):
     _apply_on = 'prestashop.mail.message'
 
     _model_name = 'prestashop.mail.message'
+    # messages are never modified
+    _watermark_field = 'date_add'
+    _micro_batch = True
@@ -1,7 +1,14 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+import hashlib
+import hmac
+import json
 import logging
+import uuid
+from collections import OrderedDict
+
 from odoo.addons.component.core import Component
+from odoo.addons.queue_job.job import identity_exact
 
 from odoo import models, fields, api, exceptions, _
 
@@ -12,6 +19,12 @@ from odoo.addons.base.res.res_partner import _tz_get
 _logger = logging.getLogger(__name__)
 
 
+def sign_webhook_payload(secret, payload):
+    """ HMAC-SHA256 signature expected for a webhook payload (bytes) """
+    return hmac.new(
+        secret.encode('utf-8'), payload, hashlib.sha256).hexdigest()
+
+
 class PrestashopBackend(models.Model):
     _name = 'prestashop.backend'
     _description = 'PrestaShop Backend Configuration'
@@ -82,6 +95,15 @@ class PrestashopBackend(models.Model):
         help="Route used in sales orders",
         ondelete='restrict',
     )
+    order_sequence_id = fields.Many2one(
+        comodel_name='ir.sequence',
+        string='Sales Order Sequence',
+        help="When set, the imported sales orders are named with this "
+             "sequence and the PrestaShop reference is kept as the "
+             "customer reference. Otherwise they are named after their "
+             "PrestaShop reference, with a suffix when it is already "
+             "used.",
+    )
     sale_team_id = fields.Many2one(
         comodel_name='crm.team',
         string='Sales Team',
@@ -99,6 +121,84 @@ class PrestashopBackend(models.Model):
     import_products_since = fields.Datetime('Import Products since')
     import_refunds_since = fields.Datetime('Import Refunds since')
     import_suppliers_since = fields.Datetime('Import Suppliers since')
+    incremental_import = fields.Boolean(
+        string='Incremental imports',
+        help="The batch imports only ask PrestaShop for the records "
+             "modified since the highest modification date they have seen "
+             "(the highest ID for the resources without dates).")
+    watermark_overlap = fields.Integer(
+        string='Overlap (minutes)',
+        default=5,
+        help="Records modified during this period before the watermark "
+             "are imported again, to catch the records saved while the "
+             "previous import was running.")
+    import_chunk_size = fields.Integer(
+        string='Import chunk size',
+        default=1,
+        help="Number of small records (addresses, messages, customer "
+             "groups, supplier infos) imported by the same job. The "
+             "records failing in a chunk are imported again in their own "
+             "job.")
+    export_settle_delay = fields.Integer(
+        string='Export settle delay',
+        default=5,
+        help="Seconds to wait before exporting a modified record, the "
+             "modifications done meanwhile are exported by the same job.")
+    reference_data_version = fields.Char(
+        readonly=True,
+        copy=False,
+        help="Changed each time the languages, countries, currencies, "
+             "taxes or order states are synchronized, so the workers "
+             "reload their cache.",
+    )
+    light_html_sanitizer = fields.Boolean(
+        string='Light HTML sanitizer',
+        help="The HTML descriptions of the products are cleaned without "
+             "parsing them, which is faster on large catalogs but does "
+             "not indent the HTML.",
+    )
+    reconcile_supplierinfo = fields.Boolean(
+        string='Reconcile supplier infos by product',
+        help="The imports of a product and of its combinations delay one "
+             "job which reads all the supplier infos of the product with "
+             "one call, imports them and deletes the ones removed from "
+             "PrestaShop, instead of reading again every supplier info of "
+             "the product after each combination.",
+    )
+    bulk_address_import = fields.Boolean(
+        string='Import addresses by page',
+        help="The customers imported by pages are imported by one job per "
+             "page, which reads and imports all their addresses with one "
+             "call, instead of one job per customer and one batch of "
+             "addresses per customer.",
+    )
+    bulk_order_details = fields.Boolean(
+        string='Read order lines in bulk',
+        help="The lines and the discounts of an order are read with one "
+             "call each instead of one call per line.")
+    fast_order_import = fields.Boolean(
+        string='Fast sales order import',
+        help="The discount lines are split by taxes and the shipping line "
+             "is added before the sales order is created, so its amounts "
+             "are computed once instead of after each change.",
+    )
+    batch_order_status = fields.Boolean(
+        string='Batch order status exports',
+        help="The states and tracking numbers of the orders are exported "
+             "by a job per backend, which groups the changes done during "
+             "the export settle delay, instead of a job per change.")
+    grouped_export = fields.Boolean(
+        string='Grouped exports',
+        help="An export and the exports of its dependencies are committed "
+             "once at the end of the job instead of after each record. The "
+             "IDs of the records created on PrestaShop are kept in a "
+             "journal meanwhile, so a failed export does not create them "
+             "twice when it is retried.")
+    watermark_ids = fields.One2many(
+        comodel_name='prestashop.sync.watermark',
+        inverse_name='backend_id',
+        string='Watermarks',
+    )
     language_ids = fields.One2many(
         comodel_name='prestashop.res.lang',
         inverse_name='backend_id',
@@ -147,6 +247,29 @@ class PrestashopBackend(models.Model):
 
     verbose = fields.Boolean(help="Output requests details in the logs")
     debug = fields.Boolean(help="Activate PrestaShop's webservice debug mode")
+    http_compression = fields.Boolean(
+        string='Compress HTTP responses',
+        default=True,
+        help="Accept compressed webservice responses. The bytes saved "
+             "are logged at the end of each batch import. When disabled, "
+             "the responses are requested uncompressed.")
+    webhook_secret = fields.Char(
+        string='Webhook secret',
+        groups='base.group_system',
+        help="Shared secret used by PrestaShop to sign the change "
+             "notifications posted on /connector_prestashop/webhook/<id>. "
+             "Notifications are refused when it is empty.")
+    webhook_delay = fields.Integer(
+        string='Webhook settle delay',
+        default=10,
+        help="Seconds to wait before importing a notified record, "
+             "the notifications received meanwhile for the same record "
+             "are merged in the same import.")
+    http_session_reuse = fields.Boolean(
+        string='Reuse HTTP connections',
+        default=True,
+        help="Keep the connections to PrestaShop alive between the calls "
+             "of a job instead of opening a new connection for each call.")
 
     matching_product_template = fields.Boolean(string="Match product template")
 
@@ -263,6 +386,7 @@ class PrestashopBackend(models.Model):
                 # is a fast operation, a direct return is fine
                 # and it is simpler to import them sequentially
                 self.env[model_name].import_batch(backend)
+        self.bump_reference_data_version()
         return True
 
     @api.multi
@@ -279,8 +403,23 @@ class PrestashopBackend(models.Model):
                     importer.run()
             self.env['prestashop.account.tax.group'].import_batch(backend)
             self.env['prestashop.sale.order.state'].import_batch(backend)
+        self.bump_reference_data_version()
         return True
 
+    @api.multi
+    def bump_reference_data_version(self):
+        """ Invalidate the reference data cached by the workers """
+        if not self:
+            return
+        # written in SQL, the bindings of a backend are often modified
+        # in a loop and the backend must not be exported nor tracked
+        self.env.cr.execute(
+            "UPDATE prestashop_backend SET reference_data_version = %s "
+            "WHERE id IN %s",
+            (uuid.uuid4().hex, tuple(self.ids))
+        )
+        self.invalidate_cache(['reference_data_version'], self.ids)
+
     @api.multi
     def _check_connection(self):
         self.ensure_one()
@@ -367,6 +506,103 @@ class PrestashopBackend(models.Model):
                 backend_record, since_date)
         return True
 
+    @api.model
+    def _webhook_binding_models(self):
+        """ PrestaShop resources accepted by the webhook and the binding
+        model importing them
+
+        Can be inherited to accept other resources.
+        """
+        return {
+            'addresses': 'prestashop.address',
+            'carriers': 'prestashop.delivery.carrier',
+            'categories': 'prestashop.product.category',
+            'combinations': 'prestashop.product.combination',
+            'customers': 'prestashop.res.partner',
+            'groups': 'prestashop.res.partner.category',
+            'order_slip': 'prestashop.refund',
+            'orders': 'prestashop.sale.order',
+            'product_suppliers': 'prestashop.product.supplierinfo',
+            'products': 'prestashop.product.template',
+            'suppliers': 'prestashop.supplier',
+        }
+
+    @api.multi
+    def _webhook_receive(self, payload, signature):
+        """ Check and process a payload posted on the webhook
+
+        :param payload: raw body of the request (bytes), a JSON document
+                        with a list of notifications, either directly or
+                        in a ``notifications`` key
+        :param signature: hexadecimal HMAC-SHA256 of the payload
+        :return: number of distinct changes scheduled for import
+        """
+        self.ensure_one()
+        if not (self.webhook_secret and signature and hmac.compare_digest(
+                sign_webhook_payload(self.webhook_secret, payload),
+                signature)):
+            raise exceptions.AccessDenied()
+        try:
+            notifications = json.loads(payload.decode('utf-8'))
+        except ValueError:
+            raise exceptions.UserError(_('Invalid webhook payload.'))
+        if isinstance(notifications, dict):
+            notifications = notifications.get(
+                'notifications', [notifications])
+        if not isinstance(notifications, list):
+            raise exceptions.UserError(_('Invalid webhook payload.'))
+        return self.webhook_notify(notifications)
+
+    @api.multi
+    def webhook_notify(self, notifications):
+        """ Schedule the import of the records changed on PrestaShop
+
+        A notification is a dict with the ``resource``, the ``id`` of the
+        record and the ``action`` (``add``, ``update`` or ``delete``).
+        The notifications of a same record are coalesced: the import job
+        is delayed by the settle delay of the backend and a pending job
+        for the same record absorbs the new notifications.
+
+        A notification which is not a dict, or whose ``id`` is not a
+        positive integer, raises a ``UserError``.
+        """
+        self.ensure_one()
+        binding_models = self._webhook_binding_models()
+        changes = OrderedDict()
+        for notification in notifications:
+            if not isinstance(notification, dict):
+                raise exceptions.UserError(
+                    _('Invalid webhook notification: %s') % (notification,))
+            resource = notification.get('resource')
+            action = notification.get('action', 'update')
+            prestashop_id = notification.get('id')
+            if isinstance(prestashop_id, str):
+                try:
+                    prestashop_id = int(prestashop_id)
+                except ValueError:
+                    pass
+            if prestashop_id is not None and (
+                    isinstance(prestashop_id, bool) or
+                    not isinstance(prestashop_id, int) or
+                    prestashop_id < 1):
+                raise exceptions.UserError(
+                    _('Invalid webhook notification: %s') % (notification,))
+            if not isinstance(resource, str):
+                resource = None
+            model_name = binding_models.get(resource)
+            if (not model_name or not prestashop_id or
+                    action not in ('add', 'update')):
+                _logger.debug('Webhook notification ignored: %s',
+                              notification)
+                continue
+            changes[(model_name, prestashop_id)] = True
+        for model_name, prestashop_id in changes:
+            self.env[model_name].with_delay(
+                eta=self.webhook_delay or None,
+                identity_key=identity_exact,
+            ).import_record(self, prestashop_id)
+        return len(changes)
+
     def get_version_ps_key(self, key):
         self.ensure_one()
         with self.work_on('_prestashop.version.key') as work:
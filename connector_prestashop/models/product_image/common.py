@@ -1,11 +1,18 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html)
 
 import base64
+import logging
 from odoo.tools import config
 from odoo import models, fields, api
 from odoo.addons.queue_job.job import job
 from odoo.addons.component.core import Component
-from ...components.backend_adapter import PrestaShopWebServiceImage
+from ...components.backend_adapter import (
+    MultipartFileBody,
+    PrestaShopWebServiceError,
+    PrestaShopWebServiceImage,
+)
+
+_logger = logging.getLogger(__name__)
 
 
 class ProductImage(models.Model):
@@ -57,7 +64,8 @@ class ProductImageAdapter(Component):
             debug = True
         return PrestaShopWebServiceImage(self.prestashop.api_url,
                                          self.prestashop.webservice_key,
-                                         debug=debug)
+                                         debug=debug,
+                                         session=self.get_session())
 
     def read(self, product_tmpl_id, image_id, options=None):
         api = self.connect()
@@ -94,6 +102,43 @@ class ProductImageAdapter(Component):
             base64.b64decode(attributes['content']).decode('latin-1')
         )]).get('prestashop').get('image').get('id')
 
+    def create_stream(self, product_id, filename, fileobj, size):
+        """ Upload an image read from a file object
+
+        :return: PrestaShop ID of the new image
+        """
+        api = self.connect()
+        body = MultipartFileBody('image', filename, fileobj, size)
+        res = api.add_image(self._prestashop_image_model, product_id, body)
+        return res['prestashop']['image']['id']
+
+    def replace_stream(self, product_id, image_id, filename, fileobj, size):
+        """ Replace the content of an image with a file object
+
+        The PrestaShop versions which cannot replace an image in place get
+        the image deleted and added again.
+
+        :return: PrestaShop ID of the image
+        """
+        api = self.connect()
+        body = MultipartFileBody('image', filename, fileobj, size)
+        try:
+            api.add_image(self._prestashop_image_model, product_id, body,
+                          image_id=image_id)
+            return image_id
+        except PrestaShopWebServiceError:
+            _logger.debug('Image %s of product %s cannot be replaced in '
+                          'place, delete it and add it again.',
+                          image_id, product_id)
+        url_del = '{}/{}/{}/{}'.format(
+            api._api_url, self._prestashop_model, product_id, image_id)
+        try:
+            api._execute(url_del, 'DELETE')
+        except PrestaShopWebServiceError:
+            pass
+        fileobj.seek(0)
+        return self.create_stream(product_id, filename, fileobj, size)
+
     def delete(self, resource, id):
         """ Delete a record on the external system """
         api = self.connect()
@@ -195,6 +195,8 @@ class PrestashopProductCombination(models.Model):
 
     @job(default_channel='root.prestashop')
     def set_product_image_variant(self, backend, combination_ids, **kwargs):
+        combination_ids = self.env['prestashop.job.payload'].unpack(
+            combination_ids)
         with backend.work_on(self._name) as work:
             importer = work.component(usage='record.importer')
             return importer.set_variant_images(combination_ids, **kwargs)
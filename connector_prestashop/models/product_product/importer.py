@@ -79,6 +79,12 @@ class ProductCombinationImporter(Component):
                 pass
 
     def import_supplierinfo(self, binding):
+        if self.backend_record.reconcile_supplierinfo:
+            self.env['prestashop.product.supplierinfo'].\
+                delay_reconcile_product(
+                    self.backend_record,
+                    self.prestashop_record['id_product'])
+            return
         ps_id = self._get_prestashop_data()['id']
         filters = {
             # 'filter[id_product]': ps_id,
@@ -413,3 +419,5 @@ class ProductProductBatchImporter(Component):
     _name = 'prestashop.product.combination.batch.importer'
     _inherit = 'prestashop.delayed.batch.importer'
     _apply_on = 'prestashop.product.combination'
+    # combinations have no dates, they are refreshed with their product
+    _watermark_field = None
@@ -1,8 +1,9 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import models, fields
+from odoo import api, models, fields
 
 from odoo.addons.component.core import Component
+from odoo.addons.queue_job.job import job, identity_exact
 from ...components.backend_adapter import (
     PrestaShopWebServiceImage,
 )
@@ -73,6 +74,26 @@ class PrestashopProductSupplierinfo(models.Model):
         oldname='openerp_id',
     )
 
+    @api.model
+    def delay_reconcile_product(self, backend, prestashop_product_id):
+        """ Delay the reconciliation of the supplier infos of a product
+
+        The imports of the combinations of a product delay the same job,
+        it is enqueued once as long as it is pending.
+        """
+        return self.with_delay(
+            identity_key=identity_exact,
+        ).reconcile_product(backend, int(prestashop_product_id))
+
+    @job(default_channel='root.prestashop')
+    @api.model
+    def reconcile_product(self, backend, prestashop_product_id):
+        """ Synchronize all the supplier infos of a product at once """
+        self.check_active(backend)
+        with backend.work_on(self._name) as work:
+            importer = work.component(usage='product.reconciler')
+            return importer.run(prestashop_product_id)
+
 
 class SupplierImageModel(models.TransientModel):
     # In actual connector version is mandatory use a model
@@ -89,7 +110,8 @@ class SupplierImageAdapter(Component):
 
     def read(self, supplier_id, options=None):
         client = PrestaShopWebServiceImage(self.prestashop.api_url,
-                                           self.prestashop.webservice_key)
+                                           self.prestashop.webservice_key,
+                                           session=self.get_session())
         res = client.get_image(
             self._prestashop_image_model,
             supplier_id,
@@ -156,7 +156,65 @@ class SupplierInfoImporter(Component):
             raise FailedJobError('Error fetching a dependency')
 
 
+class SupplierInfoProductReconciler(Component):
+    """ Synchronize all the supplier infos of a product at once
+
+    The rows of the product are read with one call and imported from
+    this response, the bindings of the template which are no longer in
+    PrestaShop are deleted.
+    """
+    _name = 'prestashop.product.supplierinfo.reconciler'
+    _inherit = 'base.prestashop.connector'
+    _apply_on = 'prestashop.product.supplierinfo'
+    _usage = 'product.reconciler'
+
+    def _get_local_bindings(self, prestashop_product_id):
+        binder = self.binder_for('prestashop.product.template')
+        template = binder.to_internal(prestashop_product_id, unwrap=True)
+        if not template:
+            return self.model.browse()
+        return self.model.search([
+            ('backend_id', '=', self.backend_record.id),
+            ('product_tmpl_id', '=', template.id),
+        ])
+
+    def run(self, prestashop_product_id):
+        adapter = self.component(usage='backend.adapter')
+        records = adapter.search_read({
+            'filter[id_product]': prestashop_product_id,
+            'display': 'full',
+        })
+        failed_ids = []
+        for record in records:
+            importer = self.component(usage='record.importer')
+            importer.prestashop_record = record
+            try:
+                with self.env.cr.savepoint():
+                    importer.run(record['id'])
+            except Exception as err:
+                _logger.info('Import of supplier info %s failed with the '
+                             'other rows of its product, delayed alone: %s',
+                             record['id'], err)
+                # the cache may contain values rolled back
+                self.env.clear()
+                failed_ids.append(record['id'])
+        for supplierinfo_id in failed_ids:
+            self.model.with_delay().import_record(
+                self.backend_record, supplierinfo_id)
+
+        remote_ids = {int(record['id']) for record in records}
+        stale = self._get_local_bindings(prestashop_product_id).filtered(
+            lambda binding: binding.prestashop_id not in remote_ids)
+        stale.mapped('odoo_id').unlink()
+        return '%d supplier infos imported, %d delayed alone, %d deleted' % (
+            len(records) - len(failed_ids), len(failed_ids), len(stale))
+
+
 class SupplierInfoBatchImporter(Component):
     _name = 'prestashop.product.supplierinfo.batch.importer'
     _inherit = 'prestashop.delayed.batch.importer'
     _apply_on = 'prestashop.product.supplierinfo'
+    _micro_batch = True
+    # product_suppliers have no dates, only the new rows are
+    # imported incrementally
+    _watermark_field = 'id'
@@ -18,6 +18,10 @@ try:
 except:
     _logger.debug('Cannot import from `prestapyt`')
 
+# Names of the PrestaShop tags per database and backend:
+# {(dbname, backend_id): (version, {tag_id: name})}
+_tag_cache = {}
+
 
 class ProductTemplate(models.Model):
     _name = 'product.template'
@@ -126,6 +130,13 @@ class PrestashopProductTemplate(models.Model):
         ('2', 'Default prestashop')],
         string='If stock shortage'
     )
+    prestashop_attribute_signature = fields.Char(
+        string='Attribute signature',
+        readonly=True,
+        help="Checksum of the combinations and option values of the "
+             "product at its last import, the attribute lines are not "
+             "rebuilt as long as it does not change.",
+    )
 
     @api.multi
     def recompute_prestashop_qty(self):
@@ -233,7 +244,8 @@ class ProductInventoryAdapter(Component):
         for shop in shops:
             url = '%s/api' % shop.default_url
             key = self.backend_record.webservice_key
-            client = PrestaShopWebServiceDict(url, key)
+            client = PrestaShopWebServiceDict(
+                url, key, session=self.get_session())
             self.export_quantity_url(filters, quantity, client=client)
 
     def export_quantity_url(self, filters, quantity, client=None):
@@ -274,6 +286,49 @@ class PrestashopProductTags(Component):
         return tags
 
 
+class PrestashopProductTagDictionary(Component):
+    """ Names of the PrestaShop tags of a backend
+
+    All the tags are read once per backend and kept in memory until the
+    reference data version of the backend changes, the tags created
+    since then are read the first time a product uses them.
+    """
+    _name = 'prestashop.product.tag.dictionary'
+    _inherit = 'base.prestashop.connector'
+    _apply_on = '_prestashop_product_tag'
+    _usage = 'tag.dictionary'
+
+    def _get_tag_names(self):
+        backend = self.backend_record
+        key = (self.env.cr.dbname, backend.id)
+        version = backend.reference_data_version
+        cached = _tag_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        adapter = self.component(usage='backend.adapter')
+        tag_names = {
+            str(tag['id']): tag['name']
+            for tag in adapter.search(filters={'display': '[id,name]'})
+        }
+        _tag_cache[key] = (version, tag_names)
+        return tag_names
+
+    def names(self, tag_ids):
+        """ Return the names of the tags, ordered by ID """
+        tag_names = self._get_tag_names()
+        tag_ids = sorted({str(tag_id) for tag_id in tag_ids}, key=int)
+        missing_ids = [tag_id for tag_id in tag_ids
+                       if tag_id not in tag_names]
+        if missing_ids:
+            adapter = self.component(usage='backend.adapter')
+            for tag in adapter.search(filters={
+                    'filter[id]': '[%s]' % '|'.join(missing_ids),
+                    'display': '[id,name]'}):
+                tag_names[str(tag['id'])] = tag['name']
+        return [tag_names[tag_id] for tag_id in tag_ids
+                if tag_id in tag_names]
+
+
 class PrestashopProductQuantityListener(Component):
     _name = 'prestashop.product.quantity.listener'
     _inherit = 'base.connector.listener'
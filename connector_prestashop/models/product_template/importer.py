@@ -9,7 +9,12 @@ from odoo.exceptions import ValidationError
 
 
 import datetime
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from html import escape as html_escape
+from html.parser import HTMLParser
 _logger = logging.getLogger(__name__)
 
 try:
@@ -27,6 +32,92 @@ try:
 except ImportError:
     _logger.debug('Cannot import from `prestapyt`')
 
+# Sanitized descriptions by sha1 of the sanitizer and the HTML content,
+# the least recently used are dropped above _HTML_CACHE_SIZE entries
+_html_cache = OrderedDict()
+_html_cache_lock = threading.Lock()
+_HTML_CACHE_SIZE = 2000
+
+
+class XmlLangCleaner(HTMLParser):
+    """ Copy an HTML content without its 'xml:lang' attributes
+
+    The content goes through the tokenizer used by BeautifulSoup, only
+    the tags having the attribute are written again, everything else is
+    copied as is.
+    """
+
+    def __init__(self):
+        super(XmlLangCleaner, self).__init__(convert_charrefs=False)
+        self.parts = []
+
+    def clean(self, content):
+        self.feed(content)
+        self.close()
+        return ''.join(self.parts)
+
+    def _tag(self, tag, attrs, close=''):
+        text = self.get_starttag_text()
+        if not any(name == 'xml:lang' for name, __ in attrs):
+            return text
+        attrs = ''.join(
+            ' %s' % name if value is None
+            else ' %s="%s"' % (name, html_escape(value, quote=True))
+            for name, value in attrs if name != 'xml:lang')
+        return '<%s%s%s>' % (tag, attrs, close)
+
+    def handle_starttag(self, tag, attrs):
+        self.parts.append(self._tag(tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.parts.append(self._tag(tag, attrs, close='/'))
+
+    def handle_endtag(self, tag):
+        self.parts.append('</%s>' % tag)
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def handle_entityref(self, name):
+        self.parts.append('&%s;' % name)
+
+    def handle_charref(self, name):
+        self.parts.append('&#%s;' % name)
+
+    def handle_comment(self, data):
+        self.parts.append('<!--%s-->' % data)
+
+    def handle_decl(self, decl):
+        self.parts.append('<!%s>' % decl)
+
+    def handle_pi(self, data):
+        self.parts.append('<?%s>' % data)
+
+    def unknown_decl(self, data):
+        self.parts.append('<![%s]]>' % data)
+
+
+def cached_html(function, content, namespace=''):
+    """ Return ``function(content)``, computed once per content
+
+    :param namespace: distinguishes the same function overridden
+                      differently, like the database
+    """
+    name = '%s.%s' % (function.__module__, function.__qualname__)
+    key = hashlib.sha1(
+        ('%s\0%s\0%s' % (namespace, name, content)).encode('utf-8')
+    ).hexdigest()
+    with _html_cache_lock:
+        if key in _html_cache:
+            _html_cache.move_to_end(key)
+            return _html_cache[key]
+    result = function(content)
+    with _html_cache_lock:
+        _html_cache[key] = result
+        while len(_html_cache) > _HTML_CACHE_SIZE:
+            _html_cache.popitem(last=False)
+    return result
+
 
 class TemplateMapper(Component):
     _name = 'prestashop.product.template.mapper'
@@ -69,18 +160,15 @@ class TemplateMapper(Component):
         associations = record.get('associations', {})
         tags = associations.get('tags', {}).get(
             self.backend_record.get_version_ps_key('tag'), [])
-        tag_adapter = self.component(
-            usage='backend.adapter', model_name='_prestashop_product_tag'
-        )
         if not isinstance(tags, list):
             tags = [tags]
         if tags:
-            ps_tags = tag_adapter.search(filters={
-                'filter[id]': '[%s]' % '|'.join(x['id'] for x in tags),
-                'display': '[name]'
-            })
-            if ps_tags:
-                return {'tags': ','.join(x['name'] for x in ps_tags)}
+            tag_dictionary = self.component(
+                usage='tag.dictionary', model_name='_prestashop_product_tag'
+            )
+            names = tag_dictionary.names([x['id'] for x in tags])
+            if names:
+                return {'tags': ','.join(names)}
 
     @mapping
     def name(self, record):
@@ -218,15 +306,30 @@ class TemplateMapper(Component):
             del child['xml:lang']
         return content.prettify()
 
+    @staticmethod
+    def sanitize_html_light(content):
+        """ Remove the 'xml:lang' attributes without building a tree
+
+        Give the same markup as ``sanitize_html`` but not indented.
+        """
+        return XmlLangCleaner().clean(content)
+
     @mapping
     def descriptions(self, record):
+        if self.backend_record.light_html_sanitizer:
+            sanitize_html = self.sanitize_html_light
+        else:
+            sanitize_html = self.sanitize_html
+        namespace = self.env.cr.dbname
         return {
-            'description': self.clear_html_field(
-                record.get('description_short', '')),
-            'description_html': self.sanitize_html(
-                record.get('description', '')),
-            'description_short_html': self.sanitize_html(
-                record.get('description_short', '')),
+            'description': cached_html(
+                self.clear_html_field, record.get('description_short', ''),
+                namespace),
+            'description_html': cached_html(
+                sanitize_html, record.get('description', ''), namespace),
+            'description_short_html': cached_html(
+                sanitize_html, record.get('description_short', ''),
+                namespace),
         }
 
     @mapping
@@ -360,6 +463,7 @@ class ImportInventory(models.TransientModel):
     @api.model
     def import_record(self, backend, prestashop_id, record=None, **kwargs):
         """ Import a record from PrestaShop """
+        record = self.env['prestashop.job.payload'].unpack(record)
         with backend.work_on(self._name) as work:
             importer = work.component(usage='record.importer')
             return importer.run(prestashop_id, record=record, **kwargs)
@@ -369,6 +473,7 @@ class ProductInventoryBatchImporter(Component):
     _name = 'prestashop._import_stock_available.batch.importer'
     _inherit = 'prestashop.delayed.batch.importer'
     _apply_on = '_import_stock_available'
+    _watermark_field = None
 
     def run(self, filters=None, **kwargs):
         if filters is None:
@@ -398,7 +503,7 @@ class ProductInventoryBatchImporter(Component):
         self.env['_import_stock_available'].with_delay().import_record(
             self.backend_record,
             record_id,
-            record=record,
+            record=self.env['prestashop.job.payload'].pack(record),
             **kwargs
         )
 
@@ -443,7 +548,7 @@ class ProductInventoryImporter(Component):
                 'prestashop.product.combination'
             )
 
-    def _check_in_new_connector_env(self):
+    def _check_concurrent_import(self):
         # not needed in this importer
         return
 
@@ -531,30 +636,60 @@ class ProductTemplateImporter(Component):
                     self.env['product.product'].browse(product.id).write(
                         {'active': False})
 
+    def _get_attribute_signature(self):
+        """ Checksum of the combinations and option values of the product """
+        associations = self.prestashop_record.get('associations', {})
+        ids = []
+        for name, key in (('combinations', 'combinations'),
+                          ('product_option_values', 'product_option_value')):
+            rows = associations.get(name, {}).get(
+                self.backend_record.get_version_ps_key(key), [])
+            if not isinstance(rows, list):
+                rows = [rows]
+            ids.append(sorted(int(row['id']) for row in rows
+                              if row.get('id')))
+        return hashlib.sha1(repr(ids).encode('utf-8')).hexdigest()
+
+    def _get_variant_attribute_values(self, template):
+        """ Return the values of the variants of a template by attribute
+
+        Read with one query instead of browsing the values of every
+        variant.
+        """
+        field = self.env['product.product']._fields['attribute_value_ids']
+        self.env.cr.execute("""
+            SELECT value.attribute_id, array_agg(DISTINCT value.id)
+            FROM product_product product
+            JOIN {relation} rel ON rel.{column1} = product.id
+            JOIN product_attribute_value value ON value.id = rel.{column2}
+            WHERE product.product_tmpl_id = %s
+            AND product.active
+            GROUP BY value.attribute_id
+        """.format(relation=field.relation,
+                   column1=field.column1,
+                   column2=field.column2),
+            (template.id,))
+        return dict(self.env.cr.fetchall())
+
     def attribute_line(self, binding):
-        attr_line_value_ids = []
-        for attr_line in binding.attribute_line_ids:
-            attr_line_value_ids.extend(attr_line.value_ids.ids)
-        template_id = binding.odoo_id.id
-        products = self.env['product.product'].search([
-            ('product_tmpl_id', '=', template_id)]
-        )
-        if products:
-            attribute_ids = []
-            for product in products:
-                for attribute_value in product.attribute_value_ids:
-                    attribute_ids.append(attribute_value.attribute_id.id)
-                    # filter unique id for create relation
-            for attribute_id in set(attribute_ids):
-                values = products.mapped('attribute_value_ids').filtered(
-                    lambda x: (x.attribute_id.id == attribute_id and
-                               x.id not in attr_line_value_ids))
-                if values:
-                    self.env['product.attribute.line'].create({
-                        'attribute_id': attribute_id,
-                        'product_tmpl_id': template_id,
-                        'value_ids': [(6, 0, values.ids)],
-                    })
+        signature = self._get_attribute_signature()
+        if (binding.prestashop_attribute_signature == signature and
+                binding.attribute_line_ids):
+            return
+        template = binding.odoo_id
+        attr_line_value_ids = set(
+            binding.attribute_line_ids.mapped('value_ids').ids)
+        values_by_attribute = self._get_variant_attribute_values(template)
+        for attribute_id, value_ids in sorted(values_by_attribute.items()):
+            value_ids = sorted(set(value_ids) - attr_line_value_ids)
+            if value_ids:
+                self.env['product.attribute.line'].create({
+                    'attribute_id': attribute_id,
+                    'product_tmpl_id': template.id,
+                    'value_ids': [(6, 0, value_ids)],
+                })
+        binding.with_context(connector_no_export=True).write(
+            {'prestashop_attribute_signature': signature})
 
     def _import_combination(self, combination, **kwargs):
         """ Import a combination
@@ -571,7 +706,7 @@ class ProductTemplateImporter(Component):
             priority=15)
         delayable.set_product_image_variant(
             self.backend_record,
-            combinations,
+            self.env['prestashop.job.payload'].pack(combinations),
             **kwargs)
 
     def import_combinations(self):
@@ -615,6 +750,10 @@ class ProductTemplateImporter(Component):
 
     def import_supplierinfo(self, binding):
         ps_id = self._get_prestashop_data()['id']
+        if self.backend_record.reconcile_supplierinfo:
+            self.env['prestashop.product.supplierinfo'].\
+                delay_reconcile_product(self.backend_record, ps_id)
+            return
         filters = {
             'filter[id_product]': ps_id,
             'filter[id_product_attribute]': 0
@@ -1,11 +1,20 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import _, api, models
+from odoo import _, api, models, tools
 
 
 class QueueJob(models.Model):
     _inherit = 'queue.job'
 
+    @api.model_cr
+    def init(self):
+        # the exports and imports merged in the job waiting for the same
+        # record are looked up by identity key on each write
+        tools.create_index(
+            self._cr, 'queue_job_identity_key_state_index', self._table,
+            ['identity_key', 'state'],
+        )
+
     @api.multi
     def related_action_record(self, binding_id_pos=0):
         self.ensure_one()
@@ -8,7 +8,7 @@ from odoo.addons.component.core import Component
 
 class PrestashopResCountry(models.Model):
     _name = 'prestashop.res.country'
-    _inherit = 'prestashop.binding.odoo'
+    _inherit = ['prestashop.binding.odoo', 'prestashop.reference.binding']
     _inherits = {'res.country': 'odoo_id'}
 
     odoo_id = fields.Many2one(
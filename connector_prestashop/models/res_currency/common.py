@@ -7,7 +7,7 @@ from odoo.addons.component.core import Component
 
 class PrestashopResCurrency(models.Model):
     _name = 'prestashop.res.currency'
-    _inherit = 'prestashop.binding.odoo'
+    _inherit = ['prestashop.binding.odoo', 'prestashop.reference.binding']
     _inherits = {'res.currency': 'odoo_id'}
 
     odoo_id = fields.Many2one(
@@ -6,7 +6,7 @@ from odoo.addons.component.core import Component
 
 class PrestashopResLang(models.Model):
     _name = 'prestashop.res.lang'
-    _inherit = 'prestashop.binding.odoo'
+    _inherit = ['prestashop.binding.odoo', 'prestashop.reference.binding']
     _inherits = {'res.lang': 'odoo_id'}
 
     odoo_id = fields.Many2one(
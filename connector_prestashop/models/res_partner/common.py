@@ -1,6 +1,6 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import models, fields
+from odoo import api, models, fields
 
 from odoo.addons.component.core import Component
 from odoo.addons.queue_job.job import job
@@ -99,6 +99,17 @@ class PrestashopResPartner(models.Model):
         backend_record.import_partners_since = now_fmt
         return True
 
+    @job(default_channel='root.prestashop')
+    @api.model
+    def import_customers_page(self, backend, prestashop_ids, **kwargs):
+        """ Import a chunk of customers, then all their addresses at once """
+        result = self.import_record_chunk(
+            backend.with_context(prestashop_skip_addresses=True),
+            prestashop_ids, **kwargs)
+        self.env['prestashop.address'].import_customer_addresses(
+            backend, prestashop_ids)
+        return result
+
 
 class PrestashopAddressMixin(models.AbstractModel):
     _name = 'prestashop.address.mixin'
@@ -148,6 +159,15 @@ class PrestashopAddress(models.Model):
     )
     vat_number = fields.Char('PrestaShop VAT')
 
+    @job(default_channel='root.prestashop')
+    @api.model
+    def import_customer_addresses(self, backend, customer_ids):
+        """ Import the addresses of customers read with one call """
+        self.check_active(backend)
+        with backend.work_on(self._name) as work:
+            importer = work.component(usage='batch.importer')
+            return importer.run_customers(customer_ids)
+
 
 class PartnerAdapter(Component):
     _name = 'prestashop.res.partner.adapter'
@@ -1,5 +1,6 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html)
 
+import logging
 import re
 
 from odoo import _
@@ -9,6 +10,8 @@ from odoo.addons.component.core import Component
 from odoo.addons.connector.components.mapper import (
     mapping, external_to_m2o, only_create)
 
+_logger = logging.getLogger(__name__)
+
 
 class PartnerImportMapper(Component):
     _name = 'prestashop.res.partner.mapper'
@@ -117,6 +120,9 @@ class ResPartnerImporter(Component):
 
     def _after_import(self, binding):
         super(ResPartnerImporter, self)._after_import(binding)
+        if self.env.context.get('prestashop_skip_addresses'):
+            # imported with the other customers of the page
+            return
         binder = self.binder_for()
         ps_id = binder.to_external(binding)
         self.env['prestashop.address'].with_delay(priority=10).import_batch(
@@ -129,6 +135,26 @@ class PartnerBatchImporter(Component):
     _inherit = 'prestashop.delayed.batch.importer'
     _apply_on = 'prestashop.res.partner'
 
+    # Customers imported with their addresses by the same job when the
+    # addresses are imported by page
+    customers_chunk_size = 100
+
+    def _run_page(self, filters, **kwargs):
+        if not self.backend_record.bulk_address_import:
+            return super(PartnerBatchImporter, self)._run_page(
+                filters, **kwargs)
+        record_ids = self._search_page(filters)
+        job_options = self._pop_job_options(kwargs)
+        for index in range(0, len(record_ids), self.customers_chunk_size):
+            self.env[self.model._name].with_delay(
+                **job_options
+            ).import_customers_page(
+                backend=self.backend_record,
+                prestashop_ids=record_ids[
+                    index:index + self.customers_chunk_size],
+                **kwargs)
+        return record_ids
+
 
 class AddressImportMapper(Component):
     _name = 'prestashop.address.mappper'
@@ -232,3 +258,47 @@ class AddressBatchImporter(Component):
     _name = 'prestashop.address.batch.importer'
     _inherit = 'prestashop.delayed.batch.importer'
     _apply_on = 'prestashop.address'
+    _micro_batch = True
+    # Customers per call reading their addresses, bounds the length of
+    # the URL
+    customers_filter_size = 100
+
+    def _read_customers_addresses(self, customer_ids):
+        records = []
+        size = self.customers_filter_size
+        for index in range(0, len(customer_ids), size):
+            records += self.backend_adapter.search_read({
+                'filter[id_customer]': '[%s]' % '|'.join(
+                    str(customer_id)
+                    for customer_id in customer_ids[index:index + size]),
+                'display': 'full',
+            })
+        return records
+
+    def run_customers(self, customer_ids):
+        """ Import all the addresses of the customers
+
+        The addresses are read with one call per 100 customers and
+        imported from these responses, the addresses which fail are
+        delayed in a job of their own.
+        """
+        records = self._read_customers_addresses(customer_ids)
+        failed_ids = []
+        for record in records:
+            importer = self.component(usage='record.importer')
+            importer.prestashop_record = record
+            try:
+                with self.env.cr.savepoint():
+                    importer.run(record['id'])
+            except Exception as err:
+                _logger.info('Import of address %s failed with the '
+                             'addresses of its customer, delayed alone: %s',
+                             record['id'], err)
+                # the cache may contain values rolled back
+                self.env.clear()
+                failed_ids.append(record['id'])
+        for address_id in failed_ids:
+            self.model.with_delay().import_record(
+                self.backend_record, address_id)
+        return '%d addresses imported, %d delayed alone' % (
+            len(records) - len(failed_ids), len(failed_ids))
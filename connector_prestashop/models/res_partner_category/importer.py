@@ -8,6 +8,7 @@ class PartnerCategoryBatchImporter(Component):
     _name = 'prestashop.res.partner.category.batch.importer'
     _inherit = 'prestashop.delayed.batch.importer'
     _apply_on = 'prestashop.res.partner.category'
+    _micro_batch = True
 
 
 class PartnerCategoryImportMapper(Component):
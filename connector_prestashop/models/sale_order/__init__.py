@@ -1,3 +1,4 @@
 
 from . import common
 from . import importer
+from . import exporter
@@ -1,7 +1,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 import openerp.addons.decimal_precision as dp
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.addons.queue_job.job import job, related_action
 from odoo.addons.component.core import Component
 
@@ -18,6 +18,15 @@ class SaleOrder(models.Model):
         string='PrestaShop Bindings',
     )
 
+    @api.model_cr
+    def init(self):
+        # the imported orders are named after their PrestaShop reference,
+        # looked up by prefix in the company of the backend
+        tools.create_index(
+            self._cr, 'sale_order_company_id_name_index', self._table,
+            ['company_id', 'name varchar_pattern_ops'],
+        )
+
 
 class PrestashopSaleOrder(models.Model):
     _name = 'prestashop.sale.order'
@@ -63,6 +72,39 @@ class PrestashopSaleOrder(models.Model):
         digits=dp.get_precision('Account'),
         readonly=True,
     )
+    prestashop_pending_state = fields.Integer(
+        string='PrestaShop state to export',
+        readonly=True,
+        help="ID of the PrestaShop state waiting for the next export of "
+             "the order states of the backend.",
+    )
+    prestashop_pending_tracking = fields.Boolean(
+        string='Tracking number to export',
+        readonly=True,
+    )
+
+    @api.multi
+    def create_lines(self, model_name, vals_list):
+        """ Create the line bindings of the order in one pass
+
+        The order and the route of its carrier are resolved once for all
+        the lines and the computed fields are not recomputed after each
+        line; the caller is expected to call ``recompute()`` when done.
+
+        :param model_name: ``prestashop.sale.order.line`` or
+                           ``prestashop.sale.order.line.discount``
+        :param vals_list: list of values of the lines to create
+        :return: the created line bindings
+        """
+        self.ensure_one()
+        model = self.env[model_name].with_context(recompute=False)
+        common = model._prepare_order_values(self)
+        common['prestashop_order_id'] = self.id
+        line_ids = []
+        for vals in vals_list:
+            vals = dict(vals, **common)
+            line_ids.append(model.create(vals).id)
+        return self.env[model_name].browse(line_ids)
 
     @job(default_channel='root.prestashop')
     def import_orders_since(self, backend, since_date=None, **kwargs):
@@ -90,24 +132,82 @@ class PrestashopSaleOrder(models.Model):
             exporter = work.component(usage='tracking.exporter')
             return exporter.run(self)
 
+    @api.model
+    def delay_export_order_status(self, backend):
+        """ Delay the export of the pending states and tracking numbers
+        of a backend, unless it is already waiting """
+        self.with_delay(
+            eta=backend.export_settle_delay or None,
+            identity_key='export_order_status(%s)' % backend.id,
+        ).export_order_status(backend)
+
+    @job(default_channel='root.prestashop')
+    @api.model
+    def export_order_status(self, backend):
+        """ Export the pending states and tracking numbers of a backend """
+        with backend.work_on(self._name) as work:
+            exporter = work.component(usage='status.batch.exporter')
+            return exporter.run()
+
+    @api.multi
+    def delay_export_tracking_number(self):
+        """ Delay the export of the tracking numbers of the orders
+
+        The pending changes are written as superuser, the users shipping
+        or confirming the orders can only read the bindings.
+        """
+        for binding in self:
+            if binding.backend_id.batch_order_status:
+                binding.sudo().prestashop_pending_tracking = True
+                self.delay_export_order_status(binding.backend_id)
+            else:
+                binding.with_delay().export_tracking_number()
+
+    @api.multi
+    def delay_export_state(self, priority=None):
+        """ Delay the export of the current state of the orders """
+        for binding in self:
+            if not binding.backend_id.batch_order_status:
+                binding.with_delay(priority=priority).export_sale_state()
+                continue
+            state = binding.find_prestashop_state()
+            if state:
+                binding.sudo().prestashop_pending_state = state
+                self.delay_export_order_status(binding.backend_id)
+
+    @api.multi
+    def delay_export_send_state(self):
+        """ Delay the export of the state of the shipped orders """
+        for binding in self:
+            backend = binding.backend_id
+            if not backend.batch_order_status:
+                binding.with_delay().export_sale_order_send_state()
+                continue
+            send_state = backend.order_send_state_id
+            state = send_state.prestashop_bind_ids[:1].prestashop_id
+            if state:
+                binding.sudo().prestashop_pending_state = state
+                self.delay_export_order_status(backend)
+
     @api.multi
     def find_prestashop_state(self):
         self.ensure_one()
         state_list_model = self.env['sale.order.state.list']
-        state_lists = state_list_model.search(
-            [('name', '=', self.state)]
-        )
-        for state_list in state_lists:
-            if state_list.prestashop_state_id.backend_id == self.backend_id:
-                return state_list.prestashop_state_id.prestashop_id
-        return None
+        state_map = state_list_model._get_prestashop_state_map(
+            self.backend_id.id)
+        return state_map.get(self.state) or None
 
     @job(default_channel='root.prestashop')
     @related_action(action='related_action_unwrap_binding')
     @api.multi
-    def export_sale_state(self):
+    def export_sale_state(self, prestashop_state=None):
+        """ Export the state of the orders
+
+        :param prestashop_state: ID of the PrestaShop state to export,
+                                 by default the one of the current state
+        """
         for sale in self:
-            new_state = sale.find_prestashop_state()
+            new_state = prestashop_state or sale.find_prestashop_state()
             if not new_state:
                 continue
             with sale.backend_id.work_on(self._name) as work:
@@ -163,14 +263,20 @@ class PrestashopSaleOrderLine(models.Model):
     )
 
     @api.model
-    def create(self, vals):
-        ps_sale_order = self.env['prestashop.sale.order'].search([
-            ('id', '=', vals['prestashop_order_id'])
-        ], limit=1)
-        vals['order_id'] = ps_sale_order.odoo_id.id
+    def _prepare_order_values(self, ps_sale_order):
+        """ Values shared by all the lines of ``ps_sale_order`` """
+        vals = {'order_id': ps_sale_order.odoo_id.id}
         route = ps_sale_order.odoo_id.carrier_id.prestashop_bind_ids[:1].route_id
         if route:
             vals['route_id'] = route.id
+        return vals
+
+    @api.model
+    def create(self, vals):
+        if 'order_id' not in vals:
+            ps_sale_order = self.env['prestashop.sale.order'].browse(
+                vals['prestashop_order_id'])
+            vals.update(self._prepare_order_values(ps_sale_order))
         return super(PrestashopSaleOrderLine, self).create(vals)
 
 
@@ -194,12 +300,17 @@ class PrestashopSaleOrderLineDiscount(models.Model):
         index=True,
     )
 
+    @api.model
+    def _prepare_order_values(self, ps_sale_order):
+        """ Values shared by all the discounts of ``ps_sale_order`` """
+        return {'order_id': ps_sale_order.odoo_id.id}
+
     @api.model
     def create(self, vals):
-        ps_sale_order = self.env['prestashop.sale.order'].search([
-            ('id', '=', vals['prestashop_order_id'])
-        ], limit=1)
-        vals['order_id'] = ps_sale_order.odoo_id.id
+        if 'order_id' not in vals:
+            ps_sale_order = self.env['prestashop.sale.order'].browse(
+                vals['prestashop_order_id'])
+            vals.update(self._prepare_order_values(ps_sale_order))
         return super(PrestashopSaleOrderLineDiscount, self).create(vals)
 
 
@@ -262,5 +373,4 @@ class PrestashopSaleOrderListener(Component):
                 [('name', '=', record.state)]
             )
             if states:
-                for binding in record.prestashop_bind_ids:
-                    binding.with_delay(priority=20).export_sale_state()
+                record.prestashop_bind_ids.delay_export_state(priority=20)
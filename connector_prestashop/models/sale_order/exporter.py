@@ -0,0 +1,119 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html)
+
+import logging
+
+from odoo import _
+from odoo.addons.component.core import Component
+
+_logger = logging.getLogger(__name__)
+
+
+class SaleOrderStatusBatchExporter(Component):
+    """ Export the pending states and tracking numbers of the orders of
+    a backend
+
+    The states come from a mapping read once per batch, and the
+    order carriers of all the orders waiting for a tracking number are
+    read with one call. The orders which fail are exported again by
+    the job of their own, where the error is raised and reported.
+    """
+    _name = 'prestashop.sale.order.status.batch.exporter'
+    _inherit = 'base.prestashop.connector'
+    _apply_on = 'prestashop.sale.order'
+    _usage = 'status.batch.exporter'
+
+    batch_size = 200
+
+    def _get_pending(self):
+        return self.model.search([
+            ('backend_id', '=', self.backend_record.id),
+            '|',
+            ('prestashop_pending_state', '!=', 0),
+            ('prestashop_pending_tracking', '=', True),
+        ], limit=self.batch_size)
+
+    def _export_states(self, bindings):
+        exported = self.model.browse()
+        failed = self.model.browse()
+        pending_states = {}
+        for binding in bindings:
+            pending_states[binding.id] = binding.prestashop_pending_state
+            datas = {
+                'order_history': {
+                    'id_order': binding.prestashop_id,
+                    'id_order_state': binding.prestashop_pending_state,
+                }
+            }
+            try:
+                self.backend_adapter.update_sale_state(
+                    binding.prestashop_id, datas)
+            except Exception:
+                _logger.info('State of order %s not exported in a batch, '
+                             'delayed alone', binding.prestashop_id,
+                             exc_info=True)
+                failed |= binding
+                continue
+            exported |= binding
+        (exported | failed).write({'prestashop_pending_state': 0})
+        for binding in failed:
+            # the pending state may be the send state, not the current one
+            binding.with_delay().export_sale_state(
+                prestashop_state=pending_states[binding.id])
+        return exported
+
+    def _get_tracking(self, binding):
+        trackings = binding.picking_ids.filtered(
+            'carrier_tracking_ref').mapped('carrier_tracking_ref')
+        return ';'.join(trackings) if trackings else None
+
+    def _export_trackings(self, bindings):
+        tracking_adapter = self.component(
+            usage='backend.adapter',
+            model_name='__not_exit_prestashop.order_carrier')
+        order_carriers = {}
+        if bindings:
+            rows = tracking_adapter.search_read({
+                'filter[id_order]': '[%s]' % '|'.join(
+                    str(binding.prestashop_id) for binding in bindings),
+                'display': 'full',
+            })
+            for row in rows:
+                # the first carrier of an order, as the single exports
+                order_carriers.setdefault(str(row['id_order']), row)
+        exported = self.model.browse()
+        failed = self.model.browse()
+        for binding in bindings:
+            tracking = self._get_tracking(binding)
+            row = order_carriers.get(str(binding.prestashop_id))
+            if tracking and row:
+                row['tracking_number'] = tracking
+                try:
+                    tracking_adapter.write_record(row)
+                except Exception:
+                    _logger.info('Tracking of order %s not exported in a '
+                                 'batch, delayed alone', binding.prestashop_id,
+                                 exc_info=True)
+                    failed |= binding
+                    continue
+            elif tracking:
+                # the job of the order fails with 'No carrier found'
+                failed |= binding
+                continue
+            exported |= binding
+        (exported | failed).write({'prestashop_pending_tracking': False})
+        for binding in failed:
+            # the tracking numbers are read again from the pickings
+            binding.with_delay().export_tracking_number()
+        return exported
+
+    def run(self):
+        """ Export a batch of pending changes, delay the next batch """
+        pending = self._get_pending()
+        states = self._export_states(
+            pending.filtered('prestashop_pending_state'))
+        trackings = self._export_trackings(
+            pending.filtered('prestashop_pending_tracking'))
+        if len(pending) == self.batch_size:
+            self.model.delay_export_order_status(self.backend_record)
+        return _('%d states and %d tracking numbers exported.') % (
+            len(states), len(trackings))
@@ -9,6 +9,7 @@ from odoo.addons.connector_ecommerce.components.sale_order_onchange import (
 )
 from ...components.exception import OrderImportRuleRetry
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from decimal import Decimal
 import logging
@@ -149,6 +150,10 @@ class SaleOrderImportMapper(Component):
         ('total_shipping_tax_excl', 'total_shipping_tax_excluded')
     ]
 
+    def __init__(self, work_context):
+        super(SaleOrderImportMapper, self).__init__(work_context)
+        self._children_cache = {}
+
     def _get_sale_order_lines(self, record):
         orders = record['associations'].get(
             'order_rows', {}).get(
@@ -164,7 +169,11 @@ class SaleOrderImportMapper(Component):
             usage='backend.adapter',
             model_name='prestashop.sale.order.line.discount'
         )
-        discount_ids = adapter.search({'filter[id_order]': record['id']})
+        if self.backend_record.bulk_order_details:
+            discount_ids = list(self._read_children(
+                'prestashop.sale.order.line.discount', record['id']))
+        else:
+            discount_ids = adapter.search({'filter[id_order]': record['id']})
         discount_mappers = []
         for discount_id in discount_ids:
             discount_mappers.append({'id': discount_id})
@@ -177,6 +186,23 @@ class SaleOrderImportMapper(Component):
          'prestashop_discount_line_ids', 'prestashop.sale.order.line.discount')
     ]
 
+    def _read_children(self, model_name, order_id):
+        """ Return the full records of the lines or the discounts of an
+        order by ID, read with one call """
+        cache = self._children_cache
+        key = (model_name, str(order_id))
+        if key not in cache:
+            adapter = self.component(
+                usage='backend.adapter', model_name=model_name
+            )
+            records = adapter.search_read({
+                'filter[id_order]': order_id,
+                'display': 'full',
+            })
+            cache[key] = OrderedDict(
+                (str(record['id']), record) for record in records)
+        return cache[key]
+
     def _map_child(self, map_record, from_attr, to_attr, model_name):
         source = map_record.source
         # TODO patch ImportMapper in connector to support callable
@@ -185,12 +211,17 @@ class SaleOrderImportMapper(Component):
         else:
             child_records = source[from_attr]
 
+        details = {}
+        if self.backend_record.bulk_order_details and child_records:
+            details = self._read_children(model_name, source['id'])
         children = []
         for child_record in child_records:
-            adapter = self.component(
-                usage='backend.adapter', model_name=model_name
-            )
-            detail_record = adapter.read(child_record['id'])
+            detail_record = details.get(str(child_record['id']))
+            if detail_record is None:
+                adapter = self.component(
+                    usage='backend.adapter', model_name=model_name
+                )
+                detail_record = adapter.read(child_record['id'])
 
             mapper = self._get_map_child_component(model_name)
             items = mapper.get_items(
@@ -199,24 +230,46 @@ class SaleOrderImportMapper(Component):
             children.extend(items)
         return children
 
-    def _sale_order_exists(self, name):
-        sale_order = self.env['sale.order'].search([
-            ('name', '=', name),
+    def _used_name_suffixes(self, basename):
+        """ Return the suffixes already used after ``basename``
+
+        All the names starting with ``basename`` are read with one
+        prefix query; 0 stands for ``basename`` itself.
+        """
+        prefix = basename + '_'
+        pattern = (prefix.replace('\\', '\\\\')
+                   .replace('%', '\\%')
+                   .replace('_', '\\_'))
+        sale_orders = self.env['sale.order'].search_read([
             ('company_id', '=', self.backend_record.company_id.id),
-        ], limit=1)
-        return len(sale_order) == 1
+            '|',
+            ('name', '=', basename),
+            ('name', '=like', pattern + '%'),
+        ], ['name'])
+        suffixes = set()
+        for sale_order in sale_orders:
+            name = sale_order['name']
+            suffix = name[len(prefix):]
+            if name == basename:
+                suffixes.add(0)
+            elif suffix.isdigit() and str(int(suffix)) == suffix:
+                suffixes.add(int(suffix))
+        return suffixes
 
     @mapping
     def name(self, record):
         basename = record['reference']
-        if not self._sale_order_exists(basename):
+        sequence = self.backend_record.order_sequence_id
+        if sequence:
+            return {'name': sequence.next_by_id(),
+                    'client_order_ref': basename}
+        suffixes = self._used_name_suffixes(basename)
+        if 0 not in suffixes:
             return {"name": basename}
         i = 1
-        name = basename + '_%d' % (i)
-        while self._sale_order_exists(name):
+        while i in suffixes:
             i += 1
-            name = basename + '_%d' % (i)
-        return {"name": name}
+        return {"name": basename + '_%d' % (i)}
 
     @mapping
     def partner_id(self, record):
@@ -380,6 +433,138 @@ class SaleOrderImporter(Component):
                               'error: %s', row['product_id'], err)
                 self.line_template_errors.append(row)
 
+    _line_fields = [
+        ('prestashop_order_line_ids', 'prestashop.sale.order.line'),
+        ('prestashop_discount_line_ids',
+         'prestashop.sale.order.line.discount'),
+    ]
+
+    def _create(self, data):
+        """ Create the order, then all its lines in one pass
+
+        The lines are taken out of the values of the order so their
+        parent order is resolved once instead of once per line, and the
+        amounts of the order are recomputed once at the end.
+        """
+        data = dict(data)
+        if self.backend_record.fast_order_import:
+            self._prepare_order_lines(data)
+        lines = []
+        for field_name, model_name in self._line_fields:
+            commands = data.get(field_name) or []
+            if not all(command[0] == 0 for command in commands):
+                continue
+            lines.append((model_name, [command[2] for command in commands]))
+            del data[field_name]
+        self._validate_data(data)
+        binding = self.model.with_context(
+            recompute=False, **self._create_context()
+        ).create(data)
+        for model_name, vals_list in lines:
+            if vals_list:
+                binding.create_lines(model_name, vals_list)
+        binding.recompute()
+        _logger.debug(
+            '%d created from prestashop %s', binding, self.prestashop_id)
+        return self.model.browse(binding.id)
+
+    def _prepare_order_lines(self, data):
+        """ Split the discounts by taxes and add the shipping line in memory
+
+        Give the same lines as ``_split_discount_lines_by_taxes`` and
+        ``_add_shipping_line`` but in the values of the order, so it is
+        created with all its lines and its amounts are computed once.
+        """
+        line_fields = self.env['sale.order.line']._fields
+        currency = self.env['product.pricelist'].browse(
+            data['pricelist_id']).currency_id
+        partner = self.env['res.partner'].browse(
+            data.get('partner_shipping_id'))
+        product_lines = [
+            command[2] for command in
+            data.get('prestashop_order_line_ids') or []
+        ]
+        discount_lines = [
+            command[2] for command in
+            data.get('prestashop_discount_line_ids') or []
+        ]
+        order_lines = list(data.get('order_line') or [])
+        sequence = max(
+            [int(vals.get('sequence') or 10)
+             for vals in product_lines + discount_lines] or [10]
+        )
+
+        amount_by_tax_ids = {}
+        total_amount = 0
+        for vals in product_lines:
+            tax_ids = tuple(sorted(vals['tax_id'][0][2]))
+            price = (float(vals['price_unit']) *
+                     (1 - float(vals.get('discount') or 0) / 100.0))
+            taxes = self.env['account.tax'].browse(tax_ids).compute_all(
+                price, currency, float(vals.get('product_uom_qty') or 0),
+                product=self.env['product.product'].browse(
+                    vals.get('product_id')),
+                partner=partner,
+            )
+            amount_by_tax_ids.setdefault(tax_ids, 0)
+            amount_by_tax_ids[tax_ids] += taxes['total_excluded']
+            total_amount += taxes['total_excluded']
+
+        if discount_lines and total_amount:
+            for vals in discount_lines:
+                vals = {key: value for key, value in vals.items()
+                        if key in line_fields}
+                for tax_ids, amount in sorted(amount_by_tax_ids.items()):
+                    sequence += 1
+                    order_lines.append((0, 0, dict(
+                        vals,
+                        sequence=sequence,
+                        price_unit=(amount / total_amount *
+                                    float(vals['price_unit'])),
+                        tax_id=[(6, 0, tax_ids)],
+                    )))
+            del data['prestashop_discount_line_ids']
+
+        if self.backend_record.taxes_included:
+            shipping_total = data.get('total_shipping_tax_included')
+        else:
+            shipping_total = data.get('total_shipping_tax_excluded')
+        shipping_total = float(shipping_total or 0)
+        carrier = self.env['delivery.carrier'].browse(data.get('carrier_id'))
+        if not carrier and shipping_total:
+            carrier = self.backend_record.carrier_id
+            if not carrier:
+                raise OrderImportRuleRetry(
+                    'Carrier not found, set default carrier and retry.')
+        if carrier:
+            order_lines.append((0, 0, self._prepare_delivery_line(
+                data, carrier, shipping_total, sequence + 1)))
+        data['order_line'] = order_lines
+        return data
+
+    def _prepare_delivery_line(self, data, carrier, price_unit, sequence):
+        """ Values of the shipping line as ``_create_delivery_line`` """
+        product = carrier.product_id
+        company_id = (data.get('company_id') or
+                      self.backend_record.company_id.id)
+        taxes = product.taxes_id.filtered(
+            lambda tax: tax.company_id.id == company_id)
+        fiscal_position = self.env['account.fiscal.position'].browse(
+            data.get('fiscal_position_id'))
+        partner = self.env['res.partner'].browse(data.get('partner_id'))
+        if partner and fiscal_position:
+            taxes = fiscal_position.map_tax(taxes, product, partner)
+        return {
+            'name': carrier.name,
+            'sequence': sequence,
+            'product_uom_qty': 1,
+            'product_uom': product.uom_id.id,
+            'product_id': product.id,
+            'price_unit': price_unit,
+            'tax_id': [(6, 0, taxes.ids)],
+            'is_delivery': True,
+        }
+
     def _split_discount_lines_by_taxes(self, binding):
         """ Weight discount taxes according to tax bases as PrestaShop does"""
 
@@ -446,8 +631,10 @@ class SaleOrderImporter(Component):
 
     def _after_import(self, binding):
         super(SaleOrderImporter, self)._after_import(binding)
-        self._split_discount_lines_by_taxes(binding)
-        self._add_shipping_line(binding)
+        if not self.backend_record.fast_order_import:
+            # otherwise already done by _prepare_order_lines
+            self._split_discount_lines_by_taxes(binding)
+            self._add_shipping_line(binding)
         self.checkpoint_line_without_template(binding)
 
     def checkpoint_line_without_template(self, binding):
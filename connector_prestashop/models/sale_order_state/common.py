@@ -1,8 +1,12 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html)
 
-from odoo import models, fields
+from odoo import api, models, fields
 from odoo.addons.component.core import Component
 
+# PrestaShop state IDs of the Odoo states by (database, backend), with
+# the reference data version they were read at
+_state_map_cache = {}
+
 
 class SaleOrderState(models.Model):
     _name = 'sale.order.state'
@@ -22,7 +26,7 @@ class SaleOrderState(models.Model):
 
 class PrestashopSaleOrderState(models.Model):
     _name = 'prestashop.sale.order.state'
-    _inherit = 'prestashop.binding.odoo'
+    _inherit = ['prestashop.binding.odoo', 'prestashop.reference.binding']
     _inherits = {'sale.order.state': 'odoo_id'}
 
     openerp_state_ids = fields.One2many(
@@ -64,6 +68,49 @@ class SaleOrderStateList(models.Model):
         string='PrestaShop ID',
     )
 
+    @api.model
+    def _get_prestashop_state_map(self, backend_id):
+        """ Return the PrestaShop state ID of the Odoo states of a backend
+
+        Kept in memory until the reference data version of the backend
+        changes, which the states, their bindings and this mapping bump.
+        """
+        backend = self.env['prestashop.backend'].browse(backend_id)
+        key = (self.env.cr.dbname, backend_id)
+        version = backend.reference_data_version
+        cached = _state_map_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        state_map = {}
+        for state_list in self.search([
+                ('prestashop_state_id.backend_id', '=', backend_id)]):
+            state_map.setdefault(state_list.name,
+                                 state_list.prestashop_state_id.prestashop_id)
+        _state_map_cache[key] = (version, state_map)
+        return state_map
+
+    @api.model
+    def create(self, vals):
+        record = super(SaleOrderStateList, self).create(vals)
+        record.mapped(
+            'prestashop_state_id.backend_id').bump_reference_data_version()
+        return record
+
+    @api.multi
+    def write(self, vals):
+        backends = self.mapped('prestashop_state_id.backend_id')
+        res = super(SaleOrderStateList, self).write(vals)
+        backends |= self.mapped('prestashop_state_id.backend_id')
+        backends.bump_reference_data_version()
+        return res
+
+    @api.multi
+    def unlink(self):
+        backends = self.mapped('prestashop_state_id.backend_id')
+        res = super(SaleOrderStateList, self).unlink()
+        backends.bump_reference_data_version()
+        return res
+
 
 class SaleOrderStateAdapter(Component):
     _name = 'prestashop.sale.order.state.adapter'
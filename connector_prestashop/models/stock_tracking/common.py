@@ -10,3 +10,9 @@ class OrderCarriers(Component):
 
     _prestashop_model = 'order_carriers'
     _export_node_name = 'order_carrier'
+
+    def write_record(self, record):
+        """ Update a record with all its values, as read with the
+        ``full`` display, without reading it again """
+        return self.client.edit(
+            self._prestashop_model, {self._export_node_name: record})
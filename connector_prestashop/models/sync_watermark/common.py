@@ -0,0 +1,109 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from datetime import datetime, timedelta
+
+from odoo import models, fields, api
+
+PRESTASHOP_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# PrestaShop uses this value for dates never set
+NULL_DATE = '0000-00-00 00:00:00'
+
+
+class PrestashopSyncWatermark(models.Model):
+    """ Highest value of a field seen by the imports of a resource
+
+    Used by the batch importers to only ask PrestaShop for the records
+    modified since the last import, with a safety overlap for the dates.
+    """
+    _name = 'prestashop.sync.watermark'
+    _description = 'PrestaShop Incremental Import Watermark'
+    _order = 'backend_id, model'
+
+    backend_id = fields.Many2one(
+        comodel_name='prestashop.backend',
+        string='PrestaShop Backend',
+        required=True,
+        ondelete='cascade',
+    )
+    model = fields.Char(string='Binding Model', required=True)
+    field = fields.Char(
+        string='Field',
+        required=True,
+        help="Field of the PrestaShop records used as watermark.",
+    )
+    value = fields.Char(
+        string='Watermark',
+        help="Highest value seen by the imports. Empty it to import all "
+             "the records on the next run.",
+    )
+
+    _sql_constraints = [
+        ('model_uniq', 'unique(backend_id, model)',
+         'A watermark already exists for this model.'),
+    ]
+
+    @api.model
+    def get_watermark(self, backend, model_name, field):
+        """ Return the watermark of a model, create it if needed """
+        watermark = self.search([
+            ('backend_id', '=', backend.id),
+            ('model', '=', model_name),
+        ])
+        if not watermark:
+            watermark = self.create({
+                'backend_id': backend.id,
+                'model': model_name,
+                'field': field,
+            })
+        elif watermark.field != field:
+            # the importer changed its field, restart from scratch
+            watermark.write({'field': field, 'value': False})
+        return watermark
+
+    @api.multi
+    def _is_date(self):
+        self.ensure_one()
+        return self.field.startswith('date_')
+
+    @api.multi
+    def apply_filters(self, filters):
+        """ Restrict the filters of a batch to the records above the
+        watermark, minus the overlap window of the backend for dates """
+        self.ensure_one()
+        if not self.value:
+            return filters
+        since = self.value
+        if self._is_date():
+            filters['date'] = '1'
+            overlap = self.backend_id.watermark_overlap
+            if overlap:
+                since = (datetime.strptime(since, PRESTASHOP_DATE_FORMAT) -
+                         timedelta(minutes=overlap))
+                since = since.strftime(PRESTASHOP_DATE_FORMAT)
+        filters['filter[%s]' % self.field] = '>[%s]' % since
+        return filters
+
+    @api.multi
+    def max_value(self, records):
+        """ Highest watermark value of a list of PrestaShop records """
+        self.ensure_one()
+        values = [record.get(self.field) for record in records]
+        if self._is_date():
+            values = [value for value in values
+                      if value and value != NULL_DATE]
+            return max(values) if values else None
+        values = [int(value) for value in values if value]
+        return str(max(values)) if values else None
+
+    @api.multi
+    def advance(self, value):
+        """ Move the watermark up to ``value``, never backwards """
+        self.ensure_one()
+        if not value:
+            return
+        if self._is_date():
+            higher = not self.value or value > self.value
+        else:
+            higher = not self.value or int(value) > int(self.value)
+        if higher:
+            self.value = value
@@ -2,6 +2,7 @@
 from . import test_auth
 from . import test_export_stock_qty
 from . import test_export_stock_qty_job
+from . import test_export_journal
 from . import test_export_tracking
 from . import test_import_carrier
 from . import test_import_backend_data
@@ -9,3 +10,6 @@ from . import test_import_inventory
 from . import test_import_partner
 from . import test_import_products
 from . import test_import_sale
+from . import test_job_payload
+from . import test_sanitize_html
+from . import test_webhook
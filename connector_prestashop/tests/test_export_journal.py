@@ -0,0 +1,45 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html)
+
+from .common import PrestashopTransactionCase
+
+
+class TestExportJournal(PrestashopTransactionCase):
+
+    def setUp(self):
+        super(TestExportJournal, self).setUp()
+        self.journal_model = self.env['prestashop.export.journal']
+        self.binding = self.env['prestashop.res.partner.category'].create({
+            'name': 'Journal',
+            'backend_id': self.backend_record.id,
+        })
+
+    def _count(self):
+        return self.journal_model.search_count(
+            self.journal_model._domain(self.backend_record, self.binding))
+
+    def test_recover_external_id(self):
+        """ The ID of a record created on PrestaShop can be recovered """
+        self.journal_model.record_external_id(
+            self.backend_record, self.binding, 42)
+        self.assertEqual('42', self.journal_model.recover_external_id(
+            self.backend_record, self.binding))
+
+    def test_forget(self):
+        """ The ID is removed from the journal once the record is bound """
+        self.journal_model.record_external_id(
+            self.backend_record, self.binding, 42)
+        self.binding.prestashop_id = 42
+        self.journal_model.forget(self.backend_record, self.binding)
+        self.assertEqual(0, self._count())
+        self.assertIsNone(self.journal_model.recover_external_id(
+            self.backend_record, self.binding))
+
+    def test_record_twice(self):
+        """ A record created again keeps its last ID """
+        self.journal_model.record_external_id(
+            self.backend_record, self.binding, 42)
+        self.journal_model.record_external_id(
+            self.backend_record, self.binding, 43)
+        self.assertEqual(1, self._count())
+        self.assertEqual('43', self.journal_model.recover_external_id(
+            self.backend_record, self.binding))
@@ -148,3 +148,66 @@ class TestExportPicking(PrestashopTransactionCase):
                      'tracking_number': 'xyz'}.items())
                 .issubset(set(body['prestashop']['order_carrier'].items())))
             self.assertDictEqual({}, self.parse_qs(request.uri))
+
+    def _create_salesman(self):
+        return self.env['res.users'].create({
+            'name': 'Unittest salesman',
+            'login': 'unittest_salesman',
+            'groups_id': [(6, 0, [
+                self.ref('base.group_user'),
+                self.ref('sales_team.group_sale_salesman'),
+            ])],
+        })
+
+    @assert_no_job_delayed
+    def test_delay_pending_tracking_number__not_manager(self):
+        """ A user who can only read the bindings queues a tracking """
+        self.backend_record.batch_order_status = True
+        sale_binding = self.create_binding_no_export(
+            'prestashop.sale.order', self.sale.id, prestashop_id=2
+        )
+        salesman = self._create_salesman()
+        sale_binding.sudo(salesman).delay_export_tracking_number()
+        self.assertTrue(sale_binding.prestashop_pending_tracking)
+        self.assertEqual(
+            1, self.instance_delay_record.export_order_status.call_count)
+
+    @assert_no_job_delayed
+    def test_delay_pending_send_state__not_manager(self):
+        """ A user who can only read the bindings queues a send state """
+        send_state = self.env['sale.order.state'].create({
+            'name': 'Shipped',
+            'company_id': self.env.user.company_id.id,
+        })
+        self.create_binding_no_export(
+            'prestashop.sale.order.state', send_state.id, prestashop_id=4
+        )
+        self.backend_record.write({
+            'batch_order_status': True,
+            'order_send_state_id': send_state.id,
+        })
+        sale_binding = self.create_binding_no_export(
+            'prestashop.sale.order', self.sale.id, prestashop_id=2
+        )
+        salesman = self._create_salesman()
+        sale_binding.sudo(salesman).delay_export_send_state()
+        self.assertEqual(4, sale_binding.prestashop_pending_state)
+
+    @assert_no_job_delayed
+    def test_export_pending_send_state__failed(self):
+        """ A failed send state is exported again alone, not the
+        state of the order """
+        self.backend_record.batch_order_status = True
+        sale_binding = self.create_binding_no_export(
+            'prestashop.sale.order', self.sale.id, prestashop_id=2,
+            prestashop_pending_state=4,
+        )
+        with self.backend_record.work_on('prestashop.sale.order') as work:
+            exporter = work.component(usage='status.batch.exporter')
+            with mock.patch.object(type(exporter.backend_adapter),
+                                   'update_sale_state',
+                                   side_effect=Exception('timeout')):
+                exporter.run()
+        self.assertEqual(0, sale_binding.prestashop_pending_state)
+        self.instance_delay_record.export_sale_state.assert_called_once_with(
+            prestashop_state=4)
@@ -0,0 +1,71 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html)
+
+from odoo.addons.queue_job.exception import FailedJobError
+
+from .common import PrestashopTransactionCase
+
+
+class TestJobPayload(PrestashopTransactionCase):
+
+    def setUp(self):
+        super(TestJobPayload, self).setUp()
+        self.payload_model = self.env['prestashop.job.payload']
+        self.combinations = [{'id': str(ps_id)} for ps_id in range(200)]
+
+    def test_small_value_inline(self):
+        """ Small arguments are passed to the jobs as is """
+        record = {'id': '1', 'id_product': '2', 'id_product_attribute': '0'}
+        self.assertEqual(record, self.payload_model.pack(record))
+        self.assertEqual(record, self.payload_model.unpack(record))
+
+    def test_pack_unpack(self):
+        """ Large arguments are stored once and passed by reference """
+        ref = self.payload_model.pack(self.combinations)
+        self.assertEqual(['__payload__'], list(ref))
+        self.assertEqual(ref, self.payload_model.pack(self.combinations))
+        self.assertEqual(1, self.payload_model.search_count(
+            [('key', '=', ref['__payload__'])]))
+        self.assertEqual(self.combinations, self.payload_model.unpack(ref))
+
+    def test_vacuumed_payload(self):
+        """ A job whose payload has been removed fails """
+        ref = self.payload_model.pack(self.combinations)
+        self.payload_model.search(
+            [('key', '=', ref['__payload__'])]).unlink()
+        with self.assertRaises(FailedJobError):
+            self.payload_model.unpack(ref)
+
+    def _age_payload(self, key, days):
+        self.env.cr.execute(
+            "UPDATE prestashop_job_payload "
+            "SET create_date = create_date - interval '%s days', "
+            "    write_date = write_date - interval '%s days' "
+            "WHERE key = %s", (days, days, key))
+        self.payload_model.invalidate_cache()
+
+    def test_vacuum_payloads(self):
+        """ Only the payloads no job enqueued recently are removed """
+        ref = self.payload_model.pack(self.combinations)
+        self._age_payload(ref['__payload__'], 40)
+        self.payload_model._scheduler_vacuum_payloads()
+        self.assertFalse(self.payload_model.search(
+            [('key', '=', ref['__payload__'])]))
+
+    def test_vacuum_repacked_payload(self):
+        """ A payload packed again for a new job is kept """
+        ref = self.payload_model.pack(self.combinations)
+        self._age_payload(ref['__payload__'], 40)
+        self.payload_model.pack(self.combinations)
+        self.payload_model._scheduler_vacuum_payloads()
+        self.assertEqual(self.combinations, self.payload_model.unpack(ref))
+
+    def test_pack_unpack_not_manager(self):
+        """ The jobs of a user without access to the payloads run """
+        user = self.env['res.users'].create({
+            'name': 'Unittest user',
+            'login': 'unittest_payload_user',
+            'groups_id': [(6, 0, [self.ref('base.group_user')])],
+        })
+        payload_model = self.payload_model.sudo(user)
+        ref = payload_model.pack(self.combinations)
+        self.assertEqual(self.combinations, payload_model.unpack(ref))
@@ -0,0 +1,58 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html)
+
+from bs4 import BeautifulSoup
+
+from odoo.addons.connector_prestashop.models.product_template import (
+    importer,
+)
+
+from .common import PrestashopTransactionCase
+
+DESCRIPTIONS = [
+    '',
+    'Plain text',
+    '<p>Simple paragraph</p>',
+    '<p lang="fr-ch" xml:lang="fr-ch">Bonjour</p>',
+    '<div xml:lang="fr" lang="fr"><p>Un <strong xml:lang=\'fr\'>deux'
+    '</strong></p><br xml:lang="fr" /></div>',
+    '<ul><li xml:lang=en>one</li><li>two</li></ul>',
+    '<p>The xml:lang="fr" attribute as text</p>',
+    '<!-- <p xml:lang="fr"> --><p>Comment</p>',
+    '<p><img src="a.jpg" alt="a > b" /> &amp; &eacute;</p>',
+    '<p title="x xml:lang=y">Attribute value</p>',
+    '<p>a < b xml:lang=fr</p>',
+    '<img alt="a > b" xml:lang="fr">',
+    '<P XML:LANG="fr" LANG="fr">Uppercase</P>',
+    '<p xml:lang="fr" hidden data-x=\'"quoted"\'>Attributes</p>',
+    '<script>if (a < b) { x = \'<p xml:lang="fr">\'; }</script>',
+    '<p xml:lang="fr"><![CDATA[x]]></p>',
+]
+
+
+class TestSanitizeHtml(PrestashopTransactionCase):
+
+    def setUp(self):
+        super(TestSanitizeHtml, self).setUp()
+        self.mapper = importer.TemplateMapper
+
+    def test_light_sanitizer_equivalence(self):
+        """ The light sanitizer gives the same markup as the full one """
+        for description in DESCRIPTIONS:
+            light = self.mapper.sanitize_html_light(description)
+            self.assertEqual(
+                self.mapper.sanitize_html(description),
+                BeautifulSoup(light, 'html.parser').prettify(),
+                description)
+
+    def test_cached_html(self):
+        """ A content is sanitized once """
+        calls = []
+
+        def sanitize(content):
+            calls.append(content)
+            return content.upper()
+
+        for content in ('<p>a</p>', '<p>a</p>', '<p>b</p>'):
+            self.assertEqual(content.upper(),
+                             importer.cached_html(sanitize, content))
+        self.assertEqual(['<p>a</p>', '<p>b</p>'], calls)
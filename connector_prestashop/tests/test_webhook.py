@@ -0,0 +1,94 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html)
+
+import json
+
+from odoo import exceptions
+
+from .common import PrestashopTransactionCase
+from ..models.prestashop_backend.common import sign_webhook_payload
+
+
+class FakePoster(object):
+    """ Post change notifications as the PrestaShop module does """
+
+    def __init__(self, backend, secret):
+        self.backend = backend
+        self.secret = secret
+
+    def post(self, notifications, secret=None):
+        return self.post_document({'notifications': notifications},
+                                  secret=secret)
+
+    def post_document(self, document, secret=None):
+        payload = json.dumps(document).encode('utf-8')
+        signature = sign_webhook_payload(secret or self.secret, payload)
+        return self.backend._webhook_receive(payload, signature)
+
+
+class TestWebhook(PrestashopTransactionCase):
+
+    def setUp(self):
+        super(TestWebhook, self).setUp()
+        self.backend_record.webhook_secret = 'webhook-secret'
+        self.poster = FakePoster(self.backend_record, 'webhook-secret')
+
+    def _import_jobs(self):
+        return self.env['queue.job'].search([
+            ('method_name', '=', 'import_record'),
+        ])
+
+    def test_webhook_enqueue(self):
+        """ Notifications create one import job per changed record """
+        queued = self.poster.post([
+            {'resource': 'orders', 'id': 5, 'action': 'add'},
+            {'resource': 'orders', 'id': '5', 'action': 'update'},
+            {'resource': 'customers', 'id': 1, 'action': 'update'},
+        ])
+        self.assertEqual(2, queued)
+        jobs = self._import_jobs()
+        self.assertEqual(
+            {('prestashop.sale.order', 5), ('prestashop.res.partner', 1)},
+            {(job.model_name, job.args[1]) for job in jobs}
+        )
+
+    def test_webhook_coalesce_pending(self):
+        """ A pending import absorbs the next notifications """
+        self.poster.post([{'resource': 'products', 'id': 8}])
+        self.poster.post([{'resource': 'products', 'id': 8}])
+        self.assertEqual(1, len(self._import_jobs()))
+
+    def test_webhook_ignored(self):
+        """ Deletions and unknown resources are not imported """
+        queued = self.poster.post([
+            {'resource': 'orders', 'id': 5, 'action': 'delete'},
+            {'resource': 'unknown', 'id': 1},
+            {'resource': 'orders'},
+        ])
+        self.assertEqual(0, queued)
+        self.assertFalse(self._import_jobs())
+
+    def test_webhook_bad_signature(self):
+        """ Notifications signed with another secret are refused """
+        with self.assertRaises(exceptions.AccessDenied):
+            self.poster.post([{'resource': 'orders', 'id': 5}],
+                             secret='other-secret')
+        self.assertFalse(self._import_jobs())
+
+    def test_webhook_invalid_payload(self):
+        """ A payload which is not a list of notifications is refused """
+        for document in ('orders', 5, None, {'notifications': 'orders'}):
+            with self.assertRaises(exceptions.UserError):
+                self.poster.post_document(document)
+        self.assertFalse(self._import_jobs())
+
+    def test_webhook_invalid_notification(self):
+        """ A notification which is not a dict or has an invalid ID is
+        refused """
+        for notification in ('orders', ['orders', 5],
+                             {'resource': 'orders', 'id': 'five'},
+                             {'resource': 'orders', 'id': 5.5},
+                             {'resource': 'orders', 'id': [5]},
+                             {'resource': 'orders', 'id': -5}):
+            with self.assertRaises(exceptions.UserError):
+                self.poster.post([notification])
+        self.assertFalse(self._import_jobs())
@@ -4,9 +4,30 @@ from odoo.tools import config
 from odoo import api, fields, models
 from odoo.addons.component.core import Component
 from odoo.addons.component_event import skip_if
+from odoo.addons.queue_job.job import job
 from odoo.addons.connector_prestashop.components.backend_adapter import PrestaShopWebServiceImage
 
 
+class PrestashopProductCategory(models.Model):
+    _inherit = 'prestashop.product.category'
+
+    @api.model
+    def export_tree(self, backend, categories, bind_values=None):
+        """ Delay the export of categories and their ancestors """
+        with backend.work_on(self._name) as work:
+            exporter = work.component(usage='tree.exporter')
+            return exporter.run(categories, bind_values=bind_values)
+
+    @job(default_channel='root.prestashop')
+    @api.model
+    def export_category_levels(self, backend, levels, count=None):
+        """ Export a level of a category tree, delay the next ones """
+        self.check_active(backend)
+        with backend.work_on(self._name) as work:
+            exporter = work.component(usage='tree.exporter')
+            return exporter.export_levels(levels, count=count)
+
+
 class PrestashopProductCategoryListener(Component):
     _name = 'prestashop.product.category.event.listener'
     _inherit = 'prestashop.connector.listener'
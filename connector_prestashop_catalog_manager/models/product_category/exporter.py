@@ -1,5 +1,6 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from odoo import _
 from odoo.addons.connector.components.mapper import mapping, changed_by
 from odoo.addons.component.core import Component
 from ..product_template.exporter import get_slug
@@ -12,27 +13,113 @@ class ProductCategoryExporter(Component):
 
     def _export_dependencies(self):
         """ Export the dependencies for the category"""
-        category_binder = self.binder_for('prestashop.product.category')
-        categories_obj = self.env['prestashop.product.category']
-        for category in self.binding:
-            self.export_parent_category(
-                category.odoo_id.parent_id, category_binder, categories_obj)
-
-    def export_parent_category(self, category, binder, ps_categ_obj):
-        if not category:
-            return
-        ext_id = binder.to_external(category.id, wrap=True)
-        if ext_id:
-            return ext_id
-        res = {
-            'backend_id': self.backend_record.id,
-            'odoo_id': category.id,
-            'link_rewrite': get_slug(category.name),
-        }
-        category_ext = ps_categ_obj.with_context(
-            connector_no_export=True).create(res)
-        parent_cat_id = category_ext.export_record()
-        return parent_cat_id
+        tree_exporter = self.component(usage='tree.exporter')
+        tree_exporter.export(self.binding.mapped('odoo_id.parent_id'))
+
+
+class ProductCategoryTreeExporter(Component):
+    """ Export a tree of categories, parents first
+
+    The categories not exported yet and their ancestors are computed in
+    one pass, the missing bindings are created with positions following
+    the highest existing one, then the categories are exported level by
+    level, so each export finds its parent already on PrestaShop.
+    """
+    _name = 'prestashop.product.category.tree.exporter'
+    _inherit = 'base.prestashop.connector'
+    _apply_on = 'prestashop.product.category'
+    _usage = 'tree.exporter'
+
+    def _get_levels(self, categories, bind_values=None):
+        """ Return the bindings to export, grouped by depth in the tree
+
+        :param categories: ``product.category`` records, their ancestors
+                           are exported with them
+        :param bind_values: values of the bindings to create
+        :return: list of ``prestashop.product.category`` recordsets,
+                 roots first
+        """
+        depths = {}
+
+        def depth(category):
+            if category.id not in depths:
+                depths[category.id] = (
+                    depth(category.parent_id) + 1
+                    if category.parent_id else 0
+                )
+            return depths[category.id]
+
+        ancestors = categories
+        parents = categories.mapped('parent_id')
+        while parents:
+            ancestors |= parents
+            parents = parents.mapped('parent_id') - ancestors
+        binding_model = self.env['prestashop.product.category'].with_context(
+            active_test=False)
+        bindings = binding_model.search([
+            ('backend_id', '=', self.backend_record.id),
+            ('odoo_id', 'in', ancestors.ids),
+        ])
+        binder = self.binder_for()
+        to_export = bindings.filtered(lambda b: not binder.to_external(b))
+        missing = ancestors - bindings.mapped('odoo_id')
+        if missing:
+            last = binding_model.search([], order='position desc', limit=1)
+            position = last.position
+            for category in missing.sorted(key=depth):
+                position += 1
+                values = {
+                    'backend_id': self.backend_record.id,
+                    'odoo_id': category.id,
+                    'link_rewrite': get_slug(category.name),
+                    'position': position,
+                }
+                values.update(bind_values or {})
+                to_export |= binding_model.with_context(
+                    connector_no_export=True).create(values)
+        levels = {}
+        for binding in to_export:
+            levels.setdefault(depth(binding.odoo_id), []).append(binding.id)
+        return [binding_model.browse(levels[level])
+                for level in sorted(levels)]
+
+    def export(self, categories, bind_values=None):
+        """ Export the categories and their ancestors in the current job """
+        exporter = self.component(usage='record.exporter')
+        for level in self._get_levels(categories, bind_values=bind_values):
+            for binding in level:
+                exporter.run(binding)
+
+    def run(self, categories, bind_values=None):
+        """ Delay the export of the categories, one job per level """
+        levels = self._get_levels(categories, bind_values=bind_values)
+        if levels:
+            self.model.with_delay(
+                description=_('Export categories: level 1/%d') % len(levels),
+            ).export_category_levels(
+                self.backend_record, [level.ids for level in levels])
+        return levels
+
+    def export_levels(self, levels, count=None):
+        """ Export the first level, then delay the export of the next one
+
+        :param levels: list of lists of binding ids, roots first
+        :param count: total number of levels, for the progress
+        """
+        count = count or len(levels)
+        number = count - len(levels) + 1
+        exporter = self.component(usage='record.exporter')
+        bindings = self.model.browse(levels[0]).exists()
+        for binding in bindings:
+            exporter.run(binding)
+        if levels[1:]:
+            self.model.with_delay(
+                description=_('Export categories: level %d/%d') % (
+                    number + 1, count),
+            ).export_category_levels(
+                self.backend_record, levels[1:], count=count)
+        return _('Level %d/%d: %d categories exported.') % (
+            number, count, len(bindings))
 
 
 class ProductCategoryExportMapper(Component):
@@ -11,6 +11,17 @@ class ProductImage(models.Model):
     front_image = fields.Boolean(string='Front image')
 
 
+class PrestashopProductImage(models.Model):
+    _inherit = 'prestashop.product.image'
+
+    prestashop_checksum = fields.Char(
+        string='Exported content checksum',
+        readonly=True,
+        help="SHA-1 of the image sent to PrestaShop, the exports of an "
+             "unchanged image skip the upload.",
+    )
+
+
 class PrestashopProductImageListener(Component):
     _name = 'prestashop.product.image.event.listener'
     _inherit = 'base.connector.listener'
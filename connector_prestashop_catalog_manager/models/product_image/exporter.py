@@ -4,6 +4,9 @@ from odoo.addons.connector.components.mapper import mapping
 from odoo.addons.component.core import Component
 from odoo.tools.translate import _
 
+import base64
+import hashlib
+import io
 import os
 import os.path
 
@@ -41,6 +44,57 @@ class ProductImageExporter(Component):
         message = _('Record exported with ID %s on Prestashop.')
         return message % self.prestashop_id
 
+    def _open_image(self):
+        """ Return a file object on the content of the image and its size
+
+        The images stored as files or in the filestore are read from the
+        disk while they are uploaded, the other ones are decoded once.
+        """
+        image = self.binding.odoo_id
+        path = None
+        if image.storage == 'file':
+            path = image.path
+        elif image.storage == 'filestore' and image.attachment_id.store_fname:
+            attachment = image.attachment_id.sudo()
+            path = attachment._full_path(attachment.store_fname)
+        if path and os.path.isfile(path):
+            return open(path, 'rb'), os.path.getsize(path)
+        content = base64.b64decode(
+            getattr(image, '_get_image_from_%s' % image.storage)())
+        return io.BytesIO(content), len(content)
+
+    def _get_checksum(self, fileobj):
+        checksum = hashlib.sha1()
+        for chunk in iter(lambda: fileobj.read(64 * 1024), b''):
+            checksum.update(chunk)
+        fileobj.seek(0)
+        return checksum.hexdigest()
+
+    def _upload(self, record):
+        fileobj, size = self._open_image()
+        with fileobj:
+            checksum = self._get_checksum(fileobj)
+            if self.prestashop_id:
+                if checksum == self.binding.prestashop_checksum:
+                    # same content as the last upload
+                    return self.prestashop_id
+                prestashop_id = self.backend_adapter.replace_stream(
+                    record['id_product'], self.prestashop_id,
+                    record['filename'], fileobj, size)
+            else:
+                prestashop_id = self.backend_adapter.create_stream(
+                    record['id_product'], record['filename'], fileobj, size)
+        self.binding.with_context(connector_no_export=True).write({
+            'prestashop_checksum': checksum,
+        })
+        return prestashop_id
+
+    def _create(self, record):
+        return self._upload(record)
+
+    def _update(self, record):
+        return self._upload(record)
+
 
 class ProductImageExportMapper(Component):
     _name = 'prestashop.product.image.export.mapper'
@@ -75,12 +129,6 @@ class ProductImageExportMapper(Component):
                     os.path.basename(record.odoo_id.path))
         return file_name
 
-    @mapping
-    def source_image(self, record):
-        content = getattr(
-            record.odoo_id, "_get_image_from_%s" % record.odoo_id.storage)()
-        return {'content': content}
-
     @mapping
     def product_id(self, record):
         if record.odoo_id.owner_model == u'product.product':
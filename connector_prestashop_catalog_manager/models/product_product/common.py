@@ -1,19 +1,92 @@
 # © 2016 Sergio Teruel <sergio.teruel@tecnativa.com>
 # License AGPL-3 - See http://www.gnu.org/licenses/agpl-3.0.html
 
-from odoo import models, fields
+from odoo import _, api, models, fields
 from odoo.addons.component.core import Component
 from odoo.addons.component_event import skip_if
+from odoo.addons.queue_job.job import job
 
 
 class PrestashopProductCombination(models.Model):
     _inherit = 'prestashop.product.combination'
+    # PS has to uncheck actual default combination first
+    _export_field_priorities = {'default_on': 99}
+
     minimal_quantity = fields.Integer(
         string='Minimal Quantity',
         default=1,
         help='Minimal Sale quantity',
     )
 
+    @job(default_channel='root.prestashop')
+    @api.model
+    def export_combinations(self, backend, binding_ids):
+        """ Export a group of combinations """
+        self.check_active(backend)
+        with backend.work_on(self._name) as work:
+            exporter = work.component(usage='batch.exporter')
+            return exporter.export(self.browse(binding_ids).exists())
+
+
+class PrestashopAttributeDictionaryMixin(models.AbstractModel):
+    """ Bindings of the attributes and values, cached per backend by the
+    attribute dictionary
+
+    Only the IDs already on PrestaShop are cached, the ones exported
+    since are found by the dictionary the first time it needs them. A
+    cached ID is wrong only once its binding is removed or bound to
+    another ID, which bumps the reference data version of the backend.
+    """
+    _name = 'prestashop.attribute.dictionary.mixin'
+    _description = 'PrestaShop Attribute Binding (abstract)'
+
+    @api.multi
+    def write(self, vals):
+        rebound = self.browse()
+        if {'backend_id', 'odoo_id'} & set(vals):
+            rebound = self
+        elif 'prestashop_id' in vals:
+            rebound = self.filtered(
+                lambda b: b.prestashop_id and
+                b.prestashop_id != vals['prestashop_id'])
+        backends = rebound.mapped('backend_id')
+        res = super(PrestashopAttributeDictionaryMixin, self).write(vals)
+        (backends | rebound.mapped('backend_id')).bump_reference_data_version()
+        return res
+
+    @api.multi
+    def unlink(self):
+        backends = self.mapped('backend_id')
+        res = super(PrestashopAttributeDictionaryMixin, self).unlink()
+        backends.bump_reference_data_version()
+        return res
+
+
+class PrestashopProductCombinationOption(models.Model):
+    _name = 'prestashop.product.combination.option'
+    _inherit = ['prestashop.product.combination.option',
+                'prestashop.attribute.dictionary.mixin']
+
+    @job(default_channel='root.prestashop')
+    @api.model
+    def export_attribute_dictionary(self, backend):
+        """ Export all the attributes and values missing on PrestaShop """
+        self.check_active(backend)
+        with backend.work_on(self._name) as work:
+            dictionary = work.component(usage='attribute.dictionary')
+            attributes = dictionary.sync_attributes(
+                self.env['product.attribute'].search([]))
+            values = dictionary.sync(
+                self.env['product.attribute.value'].search([]))
+        return _('%d attributes and %d values on PrestaShop.') % (
+            len(attributes), len(values))
+
+
+class PrestashopProductCombinationOptionValue(models.Model):
+    _name = 'prestashop.product.combination.option.value'
+    _inherit = ['prestashop.product.combination.option.value',
+                'prestashop.attribute.dictionary.mixin']
+
 
 class PrestashopProductProductListener(Component):
     _name = 'prestashop.product.product.event.listener'
@@ -24,7 +97,7 @@ class PrestashopProductProductListener(Component):
     @skip_if(lambda self, record, **kwargs: self.need_to_export(record, **kwargs))
     def on_record_create(self, record, fields=None):
         """ Called when a record is created """
-        record.with_delay().export_record(fields=fields)
+        record.delay_export_record(fields=fields)
 
     @skip_if(lambda self, record, **kwargs: self.no_connector_export(record))
     @skip_if(lambda self, record, **kwargs: self.need_to_export(record, **kwargs))
@@ -35,7 +108,7 @@ class PrestashopProductProductListener(Component):
         inventory_fields = inv_listener._get_inventory_fields()
         fields = list(set(fields).difference(set(inventory_fields)))
         if fields:
-            record.with_delay().export_record(fields=fields)
+            record.delay_export_record(fields=fields)
 
 
 class ProductProductListener(Component):
@@ -72,9 +145,8 @@ class ProductProductListener(Component):
             if 'default_on' in fields and record.active:
                 # PS has to uncheck actual default combination first
                 priority = 99
-            for binding in record.prestashop_combinations_bind_ids:
-                binding.with_delay(
-                    priority=priority).export_record(fields=fields)
+            record.prestashop_combinations_bind_ids.delay_export_record(
+                fields=fields, priority=priority)
 
 
 class PrestashopAttributeListener(Component):
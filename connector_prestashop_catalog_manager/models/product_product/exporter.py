@@ -1,12 +1,18 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from odoo import _
 from odoo.addons.connector.components.mapper import mapping, changed_by
 from odoo.addons.component.core import Component
 from collections import OrderedDict
 import logging
+import threading
 
 _logger = logging.getLogger(__name__)
 
+# PrestaShop IDs of the attributes and values by (database, backend,
+# binding model), with the reference data version they were read at
+_attribute_cache = {}
+
 
 class ProductCombinationExporter(Component):
     _name = 'prestashop.product.combination.exporter'
@@ -34,39 +40,15 @@ class ProductCombinationExporter(Component):
                                 'backend_id': self.backend_record.id,
                                 'odoo_id': image_line.id,
                             })
-                    image_content = getattr(image_line, "_get_image_from_%s" %
-                                            image_line.storage)()
-                    image_ext.export_record(
-                        image_content)
+                    image_ext.export_record()
 
     def _export_dependencies(self):
         """ Export the dependencies for the product"""
         # TODO add export of category
-        attribute_binder = self.binder_for(
-            'prestashop.product.combination.option')
-        option_binder = self.binder_for(
-            'prestashop.product.combination.option.value')
-        for value in self.binding.attribute_value_ids:
-            attribute_ext_id = attribute_binder.to_external(
-                value.attribute_id.id, wrap=True)
-            if not attribute_ext_id:
-                attribute_ext = self.env[
-                    'prestashop.product.combination.option'].with_context(
-                    connector_no_export=True).create({
-                        'backend_id': self.backend_record.id,
-                        'odoo_id': value.attribute_id.id,
-                    })
-                attribute_ext.export_record()
-            value_ext_id = option_binder.to_external(value.id, wrap=True)
-            if not value_ext_id:
-                value_ext = self.env[
-                    'prestashop.product.combination.option.value']\
-                    .with_context(connector_no_export=True).create({
-                        'backend_id': self.backend_record.id,
-                        'odoo_id': value.val_id.id,
-                        'id_attribute_group': attribute_ext_id
-                    })
-                value_ext.export_record()
+        dictionary = self.component(
+            usage='attribute.dictionary',
+            model_name='prestashop.product.combination.option')
+        dictionary.sync(self.binding.attribute_value_ids)
         self._export_images()
 
     def update_quantities(self):
@@ -77,6 +59,73 @@ class ProductCombinationExporter(Component):
         self.update_quantities()
 
 
+class ProductCombinationBatchExporter(Component):
+    """ Export the combinations of a template
+
+    The combination bindings of all the variants are searched in one
+    query and the missing ones are created together. The new
+    combinations are exported by chunks, one job per chunk.
+    """
+    _name = 'prestashop.product.combination.batch.exporter'
+    _inherit = 'base.prestashop.connector'
+    _apply_on = 'prestashop.product.combination'
+    _usage = 'batch.exporter'
+
+    chunk_size = 100
+
+    def _get_bindings(self, template):
+        """ Return the combination bindings of the variants of a
+        template binding and the ones created for the missing variants
+        """
+        products = template.product_variant_ids.filtered(
+            'attribute_value_ids')
+        bindings = self.model.with_context(active_test=False).search([
+            ('backend_id', '=', self.backend_record.id),
+            ('odoo_id', 'in', products.ids),
+        ])
+        created = self.model.browse()
+        model = self.model.with_context(connector_no_export=True)
+        for product in products - bindings.mapped('odoo_id'):
+            created |= model.create({
+                'backend_id': self.backend_record.id,
+                'odoo_id': product.id,
+                'main_template_id': template.id,
+            })
+        return bindings | created, created
+
+    def run(self, template):
+        """ Delay the export of the new combinations of a template """
+        __, created = self._get_bindings(template)
+        for index in range(0, len(created), self.chunk_size):
+            chunk = created[index:index + self.chunk_size]
+            self.model.with_delay(
+                priority=50,
+                description=_('Export %d combinations of %s') % (
+                    len(chunk), template.display_name),
+            ).export_combinations(self.backend_record, chunk.ids)
+        return created
+
+    def export(self, bindings):
+        """ Export combinations in the current job """
+        # the attributes are resolved once for all the combinations
+        dictionary = self.component(
+            usage='attribute.dictionary',
+            model_name='prestashop.product.combination.option')
+        dictionary.sync(bindings.mapped('attribute_value_ids'))
+        exporter = self.component(usage='record.exporter')
+        for binding in bindings:
+            exporter.run(binding)
+        return _('%d combinations exported.') % len(bindings)
+
+    def export_template(self, template):
+        """ Export all the unexported combinations of a template in the
+        current job """
+        bindings, __ = self._get_bindings(template)
+        binder = self.binder_for()
+        return self.export(
+            bindings.filtered(lambda b: not binder.to_external(b)))
+
+
 class ProductCombinationExportMapper(Component):
     _name = 'prestashop.product.combination.export.mapper'
     _inherit = 'translation.prestashop.export.mapper'
@@ -171,6 +220,120 @@ class ProductCombinationOptionExporter(Component):
         return res['prestashop']['product_option']['id']
 
 
+class ProductAttributeDictionary(Component):
+    """ Resolve the PrestaShop IDs of attributes and attribute values
+
+    The bindings of the requested attributes and values are searched in
+    one query, the missing ones are created and exported in one pass.
+    The resolved IDs are kept on the component, so the exports done
+    with the same dictionary do not check them again. When the bindings
+    are committed as soon as they are exported, the IDs already on
+    PrestaShop are read once per backend and kept in memory until the
+    reference data version of the backend changes.
+    """
+    _name = 'prestashop.product.attribute.dictionary'
+    _inherit = 'prestashop.exporter'
+    _apply_on = 'prestashop.product.combination.option'
+    _usage = 'attribute.dictionary'
+
+    def __init__(self, work_context):
+        super(ProductAttributeDictionary, self).__init__(work_context)
+        self.resolved = {
+            'prestashop.product.combination.option': {},
+            'prestashop.product.combination.option.value': {},
+        }
+
+    def _get_bindings(self, binding_model, records):
+        """ Return the bindings of the records, create the missing ones """
+        model = self.env[binding_model].with_context(active_test=False)
+        bindings = model.search([
+            ('backend_id', '=', self.backend_record.id),
+            ('odoo_id', 'in', records.ids),
+        ])
+        missing = records - bindings.mapped('odoo_id')
+        if not missing:
+            return bindings
+        # a concurrent export creating the same binding retries later
+        with self._retry_unique_violation():
+            model_c = model.sudo().with_context(connector_no_export=True)
+            for record in missing:
+                bindings |= model_c.create({
+                    'backend_id': self.backend_record.id,
+                    'odoo_id': record.id,
+                })
+            # one eager commit for all the bindings, so the other jobs
+            # see them instead of creating them again
+            # do never commit during tests nor in the grouped exports
+            if self._commits_bindings():
+                model_c._cr.commit()  # pylint: disable=invalid-commit
+        return bindings
+
+    def _commits_bindings(self):
+        """ The bindings are committed by the export, they can be cached
+
+        The grouped exports and the tests do not commit them, the cache
+        would keep the bindings of a rolled back transaction.
+        """
+        return not (getattr(threading.currentThread(), 'testing', False) or
+                    self.backend_record.grouped_export)
+
+    def _get_prestashop_ids(self, binding_model):
+        backend = self.backend_record
+        key = (self.env.cr.dbname, backend.id, binding_model)
+        version = backend.reference_data_version
+        cached = _attribute_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        self.env.cr.execute(
+            "SELECT odoo_id, prestashop_id FROM %s "
+            "WHERE backend_id = %%s AND prestashop_id > 0" %
+            self.env[binding_model]._table, (backend.id,))
+        prestashop_ids = dict(self.env.cr.fetchall())
+        _attribute_cache[key] = (version, prestashop_ids)
+        return prestashop_ids
+
+    def _sync(self, binding_model, records):
+        resolved = self.resolved[binding_model]
+        records = records.filtered(lambda r: r.id not in resolved)
+        if records and self._commits_bindings():
+            known = self._get_prestashop_ids(binding_model)
+            resolved.update((record_id, known[record_id])
+                            for record_id in records.ids
+                            if record_id in known)
+            records = records.filtered(lambda r: r.id not in resolved)
+        if not records:
+            return resolved
+        binder = self.binder_for(binding_model)
+        exporter = self.component(usage='record.exporter',
+                                  model_name=binding_model)
+        for binding in self._get_bindings(binding_model, records):
+            external_id = binder.to_external(binding)
+            if not external_id:
+                exporter.run(binding)
+                external_id = binder.to_external(binding)
+            resolved[binding.odoo_id.id] = external_id
+        return resolved
+
+    def sync_attributes(self, attributes):
+        """ Export the attributes missing on PrestaShop
+
+        :param attributes: ``product.attribute`` records
+        :return: PrestaShop IDs of the attributes by attribute id
+        """
+        return self._sync('prestashop.product.combination.option',
+                          attributes)
+
+    def sync(self, values):
+        """ Export the values, and their attributes, missing on PrestaShop
+
+        :param values: ``product.attribute.value`` records
+        :return: PrestaShop IDs of the values by value id
+        """
+        self.sync_attributes(values.mapped('attribute_id'))
+        return self._sync('prestashop.product.combination.option.value',
+                          values)
+
+
 class ProductCombinationOptionExportMapper(Component):
     _name = 'prestashop.product.combination.option.export.mapper'
     _inherit = 'translation.prestashop.export.mapper'
@@ -199,15 +362,10 @@ class ProductCombinationOptionValueExporter(Component):
 
     def _export_dependencies(self):
         """ Export the dependencies for the record"""
-        attribute_id = self.binding.attribute_id.id
-        # export product attribute
-        attr_model = 'prestashop.product.combination.option'
-        binder = self.binder_for(attr_model)
-        if not binder.to_external(attribute_id, wrap=True):
-            with self.backend_id.work_on(attr_model) as work:
-                exporter = work.component(usage='record.exporter')
-                exporter.run(attribute_id)
-        return
+        dictionary = self.component(
+            usage='attribute.dictionary',
+            model_name='prestashop.product.combination.option')
+        dictionary.sync_attributes(self.binding.attribute_id)
 
 
 class ProductCombinationOptionValueExportMapper(Component):
@@ -5,6 +5,7 @@ from odoo import models, fields, api
 import openerp.addons.decimal_precision as dp
 from odoo.addons.component.core import Component
 from odoo.addons.component_event import skip_if
+from odoo.addons.queue_job.job import job
 
 
 class PrestashopProductTemplate(models.Model):
@@ -48,6 +49,44 @@ class PrestashopProductTemplate(models.Model):
 
     state = fields.Boolean(string='State', default=True)
 
+    @api.model
+    def bulk_export(self, backend, bindings):
+        """ Export the templates in stages, see the bulk exporter """
+        with backend.work_on(self._name) as work:
+            exporter = work.component(usage='bulk.exporter')
+            return exporter.run(bindings)
+
+    @job(default_channel='root.prestashop')
+    @api.model
+    def export_products_dependencies(self, backend, binding_ids):
+        """ Export the categories and attributes of templates """
+        self.check_active(backend)
+        with backend.work_on(self._name) as work:
+            exporter = work.component(usage='bulk.exporter')
+            return exporter.export_dependencies(
+                self.browse(binding_ids).exists())
+
+    @job(default_channel='root.prestashop')
+    @api.model
+    def export_products_chunk(self, backend, binding_ids, number, count):
+        """ Export a chunk of templates without their variants """
+        self.check_active(backend)
+        backend = backend.with_context(prestashop_bulk_export=True)
+        with backend.work_on(self._name) as work:
+            exporter = work.component(usage='bulk.exporter')
+            return exporter.export_chunk(
+                self.browse(binding_ids).exists(), number, count)
+
+    @job(default_channel='root.prestashop')
+    @api.model
+    def export_products_variants(self, backend, binding_ids, number, count):
+        """ Export the images and combinations of a chunk of templates """
+        self.check_active(backend)
+        with backend.work_on(self._name) as work:
+            exporter = work.component(usage='bulk.exporter')
+            return exporter.export_variants(
+                self.browse(binding_ids).exists(), number, count)
+
 
 class PrestashopProductTemplateListener(Component):
     _name = 'prestashop.product.template.event.listener'
@@ -58,13 +97,13 @@ class PrestashopProductTemplateListener(Component):
     @skip_if(lambda self, record, **kwargs: self.need_to_export(record, **kwargs))
     def on_record_create(self, record, fields=None):
         """ Called when a record is created """
-        record.with_delay().export_record(fields=fields)
+        record.delay_export_record(fields=fields)
 
     @skip_if(lambda self, record, **kwargs: self.no_connector_export(record))
     @skip_if(lambda self, record, **kwargs: self.need_to_export(record, **kwargs))
     def on_record_write(self, record, fields=None):
         """ Called when a record is written """
-        record.with_delay().export_record(fields=fields)
+        record.delay_export_record(fields=fields)
         if 'minimal_quantity' in fields:
             record.product_variant_ids.mapped(
                 'prestashop_combinations_bind_ids').filtered(
@@ -82,5 +121,4 @@ class ProductTemplateListener(Component):
     @skip_if(lambda self, record, **kwargs: self.need_to_export(record.prestashop_bind_ids, **kwargs))
     def on_record_write(self, record, fields=None):
         """ Called when a record is written """
-        for binding in record.prestashop_bind_ids:
-            binding.with_delay().export_record(fields=fields)
+        record.prestashop_bind_ids.delay_export_record(fields=fields)
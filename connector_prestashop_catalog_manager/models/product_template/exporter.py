@@ -1,7 +1,6 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import fields
-from datetime import timedelta
+from odoo import _, fields
 
 from odoo.addons.connector.components.mapper import (
     mapping, m2o_to_external, changed_by)
@@ -41,8 +40,9 @@ class ProductTemplateExporter(Component):
     def _update(self, data):
         """ Update an Prestashop record """
         assert self.prestashop_id
-        self.export_variants()
-        self.check_images()
+        if not self.env.context.get('prestashop_bulk_export'):
+            self.export_variants()
+            self.check_images()
         self.backend_adapter.write(self.prestashop_id, data)
 
     def export_categories(self, category):
@@ -52,20 +52,9 @@ class ProductTemplateExporter(Component):
         ext_id = category_binder.to_external(category, wrap=True)
         if ext_id:
             return ext_id
-
-        ps_categ_obj = self.env['prestashop.product.category']
-        position_cat_id = ps_categ_obj.search(
-            [], order='position desc', limit=1)
-        obj_position = position_cat_id.position + 1
-        res = {
-            'backend_id': self.backend_record.id,
-            'odoo_id': category.id,
-            'link_rewrite': get_slug(category.name),
-            'position': obj_position,
-        }
-        binding = ps_categ_obj.with_context(
-            connector_no_export=True).create(res)
-        binding.export_record()
+        tree_exporter = self.component(
+            usage='tree.exporter', model_name='prestashop.product.category')
+        tree_exporter.export(category)
 
     def _parent_length(self, categ):
         if not categ.parent_id:
@@ -76,49 +65,22 @@ class ProductTemplateExporter(Component):
     def _export_dependencies(self):
         """ Export the dependencies for the product"""
         super(ProductTemplateExporter, self)._export_dependencies()
-        attribute_binder = self.binder_for(
-            'prestashop.product.combination.option')
-        option_binder = self.binder_for(
-            'prestashop.product.combination.option.value')
-
-        for category in self.binding.categ_ids:
-            self.export_categories(category)
-
-        for line in self.binding.attribute_line_ids:
-            attribute_ext_id = attribute_binder.to_external(
-                line.attribute_id, wrap=True)
-            if not attribute_ext_id:
-                self._export_dependency(
-                    line.attribute_id,
-                    'prestashop.product.combination.option')
-            for value in line.value_ids:
-                value_ext_id = option_binder.to_external(value, wrap=True)
-                if not value_ext_id:
-                    self._export_dependency(
-                        value, 'prestashop.product.combination.option.value')
+        tree_exporter = self.component(
+            usage='tree.exporter', model_name='prestashop.product.category')
+        tree_exporter.export(self.binding.categ_ids)
+
+        lines = self.binding.attribute_line_ids
+        dictionary = self.component(
+            usage='attribute.dictionary',
+            model_name='prestashop.product.combination.option')
+        dictionary.sync_attributes(lines.mapped('attribute_id'))
+        dictionary.sync(lines.mapped('value_ids'))
 
     def export_variants(self):
-        combination_obj = self.env['prestashop.product.combination']
-        for product in self.binding.product_variant_ids:
-            if not product.attribute_value_ids:
-                continue
-            combination = combination_obj.search([
-                ('backend_id', '=', self.backend_record.id),
-                ('odoo_id', '=', product.id),
-            ], limit=1)
-            if not combination:
-                combination = combination_obj.with_context(
-                    connector_no_export=True).create({
-                        'backend_id': self.backend_record.id,
-                        'odoo_id': product.id,
-                        'main_template_id': self.binding_id,
-                    })
-                # sólo lo exportamos si se ha creado uno nuevo y
-                # con la función nueva export_record_saving_prestashop_id
-                combination.with_delay(
-                    priority=50,
-                    eta=timedelta(seconds=20)
-                ).export_record_saving_prestashop_id()
+        batch_exporter = self.component(
+            usage='batch.exporter',
+            model_name='prestashop.product.combination')
+        batch_exporter.run(self.binding)
 
     def _not_in_variant_images(self, image):
         images = []
@@ -153,14 +115,109 @@ class ProductTemplateExporter(Component):
             product.update_prestashop_quantities()
 
     def _after_export(self):
-        self.check_images()
-        self.export_variants()
-        self.update_quantities()
+        # the bulk export sends images, combinations and quantities
+        # in its own jobs, once per chunk of templates
+        if not self.env.context.get('prestashop_bulk_export'):
+            self.check_images()
+            self.export_variants()
+            self.update_quantities()
         if not self.binding.date_add:
             self.binding.with_context(
                 connector_no_export=True).date_add = fields.Datetime.now()
 
 
+class ProductTemplateBulkExporter(Component):
+    """ Export a selection of templates in stages
+
+    1. the categories and attributes shared by the templates are
+       exported once, parents first;
+    2. the templates are exported by chunks, without their images and
+       combinations;
+    3. each chunk then exports the images, the combinations and the
+       quantities of its templates.
+
+    Each stage is a job which delays the next one, the jobs report the
+    progress in their description and result.
+    """
+    _name = 'prestashop.product.template.bulk.exporter'
+    _inherit = 'prestashop.exporter'
+    _apply_on = 'prestashop.product.template'
+    _usage = 'bulk.exporter'
+
+    chunk_size = 20
+
+    def _chunks(self, bindings):
+        return [bindings[index:index + self.chunk_size]
+                for index in range(0, len(bindings), self.chunk_size)]
+
+    def run(self, bindings):
+        """ Delay the first stage of the export of the bindings """
+        return self.model.with_delay(
+            priority=10,
+            description=_('Export %d products: dependencies') % len(bindings),
+        ).export_products_dependencies(self.backend_record, bindings.ids)
+
+    def export_dependencies(self, bindings):
+        """ Export the categories and attributes of the bindings, then
+        delay the export of the templates by chunks """
+        categories = bindings.mapped('categ_ids')
+        tree_exporter = self.component(
+            usage='tree.exporter', model_name='prestashop.product.category')
+        tree_exporter.export(categories)
+        lines = bindings.mapped('attribute_line_ids')
+        dictionary = self.component(
+            usage='attribute.dictionary',
+            model_name='prestashop.product.combination.option')
+        dictionary.sync_attributes(lines.mapped('attribute_id'))
+        dictionary.sync(lines.mapped('value_ids'))
+        chunks = self._chunks(bindings)
+        for number, chunk in enumerate(chunks, 1):
+            self.model.with_delay(
+                priority=15,
+                description=_('Export products: chunk %d/%d') % (
+                    number, len(chunks)),
+            ).export_products_chunk(self.backend_record, chunk.ids,
+                                    number, len(chunks))
+        return _('%d categories and %d attributes checked, '
+                 '%d chunks of products delayed.') % (
+            len(categories), len(lines.mapped('attribute_id')), len(chunks))
+
+    def export_chunk(self, bindings, number, count):
+        """ Export the templates of a chunk, then delay the export of
+        their images and combinations """
+        exporter = self.component(usage='record.exporter')
+        for binding in bindings:
+            exporter.run(binding)
+        self.model.with_delay(
+            priority=20,
+            description=_('Export products: variants of chunk %d/%d') % (
+                number, count),
+        ).export_products_variants(self.backend_record, bindings.ids,
+                                   number, count)
+        return _('Chunk %d/%d: %d products exported.') % (
+            number, count, len(bindings))
+
+    def export_variants(self, bindings, number, count):
+        """ Export the images, combinations and quantities of the
+        templates of a chunk """
+        image_count = combination_count = 0
+        variant_exporter = self.component(
+            usage='batch.exporter',
+            model_name='prestashop.product.combination')
+        for binding in bindings:
+            for image in binding.image_ids:
+                self._export_dependency(image, 'prestashop.product.image')
+                image_count += 1
+            variant_exporter.export_template(binding)
+            combination_count += len(binding.product_variant_ids.filtered(
+                'attribute_value_ids'))
+            if len(binding.product_variant_ids) == 1:
+                products = binding.odoo_id.product_variant_ids
+                products.update_prestashop_quantities()
+        return _('Chunk %d/%d: %d images and %d combinations exported.') % (
+            number, count, image_count, combination_count)
+
+
 class ProductTemplateExportMapper(Component):
     _name = 'prestashop.product.template.export.mapper'
     _inherit = 'translation.prestashop.export.mapper'
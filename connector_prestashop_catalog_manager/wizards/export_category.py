@@ -2,7 +2,6 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 from odoo import models, fields, api
-from ..models.product_template.exporter import get_slug
 
 
 class PrestashopExportCategory(models.TransientModel):
@@ -30,16 +29,15 @@ class PrestashopExportCategory(models.TransientModel):
         self.ensure_one()
         category_obj = self.env['product.category']
         ps_category_obj = self.env['prestashop.product.category']
-        for category in category_obj.browse(self.env.context['active_ids']):
-            ps_category = ps_category_obj.search([
-                ('odoo_id', '=', category.id),
-                ('backend_id', '=', self.backend_id.id),
-                ('default_shop_id', '=', self.shop_id.id),
-            ])
-            if not ps_category:
-                ps_category_obj.create({
-                    'backend_id': self.backend_id.id,
-                    'default_shop_id': self.shop_id.id,
-                    'link_rewrite': get_slug(category.name),
-                    'odoo_id': category.id,
-                })
+        categories = category_obj.browse(self.env.context['active_ids'])
+        existing = ps_category_obj.search([
+            ('odoo_id', 'in', categories.ids),
+            ('backend_id', '=', self.backend_id.id),
+            ('default_shop_id', '=', self.shop_id.id),
+        ])
+        categories -= existing.mapped('odoo_id')
+        if categories:
+            # the tree is exported parents first, one job per level
+            ps_category_obj.export_tree(
+                self.backend_id, categories,
+                bind_values={'default_shop_id': self.shop_id.id})
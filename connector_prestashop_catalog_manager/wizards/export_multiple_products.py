@@ -112,34 +112,65 @@ class ExportMultipleProducts(models.TransientModel):
         products.update_prestashop_quantities()
 
     @api.multi
-    def create_prestashop_template(self, product):
-        presta_tmpl_obj = self.env['prestashop.product.template']
-        return presta_tmpl_obj.create({
+    def _prepare_prestashop_template(self, product):
+        return {
             'backend_id': self.backend_id.id,
             'default_shop_id': self.shop_id.id,
             'link_rewrite': get_slug(product.name),
             'odoo_id': product.id,
-        })
+        }
+
+    @api.multi
+    def create_prestashop_template(self, product):
+        return self.create_prestashop_templates(product)
+
+    @api.multi
+    def create_prestashop_templates(self, products):
+        """ Create the bindings of the products in one pass
+
+        The templates are exported by the bulk export, not one by one,
+        and the computed fields are recomputed once for all of them.
+        """
+        presta_tmpl_obj = self.env['prestashop.product.template']
+        create_obj = presta_tmpl_obj.with_context(
+            connector_no_export=True, recompute=False)
+        binding_ids = [
+            create_obj.create(self._prepare_prestashop_template(product)).id
+            for product in products
+        ]
+        presta_tmpl_obj.recompute()
+        return presta_tmpl_obj.browse(binding_ids)
 
     @api.multi
     def export_products(self):
         self.ensure_one()
         product_obj = self.env['product.template']
         presta_tmpl_obj = self.env['prestashop.product.template']
-        for product in product_obj.browse(self.env.context['active_ids']):
-            presta_tmpl = presta_tmpl_obj.search([
-                ('odoo_id', '=', product.id),
-                ('backend_id', '=', self.backend_id.id),
-                ('default_shop_id', '=', self.shop_id.id),
-            ])
-            if not presta_tmpl:
+        products = product_obj.browse(self.env.context['active_ids'])
+        existing = presta_tmpl_obj.search([
+            ('odoo_id', 'in', products.ids),
+            ('backend_id', '=', self.backend_id.id),
+            ('default_shop_id', '=', self.shop_id.id),
+        ])
+        existing_by_product = {}
+        for binding in existing:
+            existing_by_product.setdefault(
+                binding.odoo_id.id, []).append(binding)
+        new_product_ids = []
+        for product in products:
+            presta_tmpls = existing_by_product.get(product.id)
+            if not presta_tmpls:
                 self._check_images(product)
                 cat = self._check_category(product)
                 var = self._check_variants(product)
                 if not(var and cat):
                     continue
-                self.create_prestashop_template(product)
+                new_product_ids.append(product.id)
             else:
-                for tmpl in presta_tmpl:
+                for tmpl in presta_tmpls:
                     if ' ' in tmpl.link_rewrite:
                         tmpl.link_rewrite = get_slug(tmpl.link_rewrite)
+        new_bindings = self.create_prestashop_templates(
+            product_obj.browse(new_product_ids))
+        if new_bindings:
+            presta_tmpl_obj.bulk_export(self.backend_id, new_bindings)